@@ -0,0 +1,132 @@
+import pygame
+
+# категория -> (максимум одновременных голосов, приоритет по умолчанию)
+# (голос с большим приоритетом может занять канал голоса с меньшим)
+CATEGORIES = {
+    "ui": (2, 4),
+    "player": (4, 3),
+    "powerup": (3, 3),
+    "hit": (4, 2),
+    "item": (6, 2),
+    "enemy": (4, 1),
+}
+
+
+class Voice():
+    """Класс для звука, запущенного на канале микшера"""
+    __slots__ = ("index", "channel", "sound", "category", "priority",
+                 "started")
+
+    def __init__(self, index, channel, sound, category, priority, started):
+        self.index = index  # номер канала
+        self.channel = channel
+        self.sound = sound
+        self.category = category
+        self.priority = priority
+        self.started = started  # номер кадра запуска
+
+    @property
+    def playing(self) -> bool:
+        return self.channel.get_busy() and \
+            self.channel.get_sound() is self.sound
+
+
+class VoiceManager():
+    """Класс для распределения каналов микшера между звуками
+        (у каждой категории есть предел одновременных голосов, при нехватке
+        каналов более важный звук останавливает самый старый менее важный,
+        а одинаковые звуки, запущенные за один кадр, не дублируются)"""
+
+    def __init__(self, categories=CATEGORIES):
+        self.categories = categories
+        self.channels = []
+        self.voices = {}  # номер канала -> Voice
+        self.frame = 0
+        self.frame_sounds = {}  # id звука -> канал, запущенные в этом кадре
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.deduped = 0
+
+    def set_num_channels(self, amount: int):
+        """метод для резервирования каналов микшера"""
+        pygame.mixer.set_num_channels(amount)
+        self.channels = [pygame.mixer.Channel(index)
+                         for index in range(amount)]
+        self.voices.clear()
+
+    def begin_frame(self):
+        """метод для начала нового кадра (вызывается сценой каждый кадр)"""
+        self.frame += 1
+        self.frame_sounds.clear()
+
+    def collect(self):
+        """метод для удаления закончившихся голосов"""
+        finished = [index for index, voice in self.voices.items()
+                    if not voice.playing]
+        for index in finished:
+            del self.voices[index]
+
+    def find_victim(self, voices, priority: int):
+        """метод для выбора голоса, который можно остановить ради звука
+            с приоритетом priority (самый неважный, затем самый старый)"""
+        candidates = [voice for voice in voices if voice.priority <= priority]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda voice: (voice.priority, voice.started))
+
+    def get_channel(self, category: str, priority: int):
+        """метод для получения номера канала под новый голос категории
+            (None, если звук нужно отбросить)"""
+        limit = self.categories[category][0]
+        same_category = [voice for voice in self.voices.values()
+                         if voice.category == category]
+        if len(same_category) >= limit:
+            if (victim := self.find_victim(same_category, priority)) is None:
+                return None
+            self.stolen += 1
+            return victim.index
+        for index, channel in enumerate(self.channels):
+            if index not in self.voices and not channel.get_busy():
+                return index
+        # чужую категорию можно вытеснить только менее важным звуком
+        if (victim := self.find_victim(self.voices.values(),
+                                       priority - 1)) is None:
+            return None
+        self.stolen += 1
+        return victim.index
+
+    def play(self, sound: pygame.mixer.Sound, category="item", priority=None,
+             loops=0):
+        """метод для воспроизведения звука в категории
+            (возвращает канал или None, если звук отброшен)"""
+        if not self.channels:
+            return None
+        if (channel := self.frame_sounds.get(id(sound))) is not None:
+            self.deduped += 1
+            return channel
+        if priority is None:
+            priority = self.categories[category][1]
+        self.collect()
+        if (index := self.get_channel(category, priority)) is None:
+            self.dropped += 1
+            return None
+        channel = self.channels[index]
+        channel.play(sound, loops)
+        self.voices[index] = Voice(
+            index, channel, sound, category, priority, self.frame)
+        self.frame_sounds[id(sound)] = channel
+        self.played += 1
+        return channel
+
+    def get_stats(self) -> dict:
+        return {
+            "played": self.played,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+            "deduped": self.deduped,
+            "active": len(self.voices),
+        }
+
+
+voices = VoiceManager()
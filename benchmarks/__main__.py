@@ -0,0 +1,50 @@
+from benchmarks.runner import (compare_results, load_results, run_benchmarks,
+                               save_results)
+from benchmarks.scenarios import SCENARIOS
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замер времени кадра уровня в тяжелых сценариях")
+    parser.add_argument("scenarios", nargs="*",
+                        help="сценарии для запуска (по умолчанию все): "
+                             + ", ".join(SCENARIOS))
+    parser.add_argument("-f", "--frames", type=int, default=600)
+    parser.add_argument("-w", "--warmup", type=int, default=60)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json",
+                        help="файл для сохранения результатов")
+    parser.add_argument("-c", "--compare",
+                        help="файл с результатами предыдущего запуска")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="допустимое ухудшение p95 при сравнении")
+    args = parser.parse_args()
+    if (unknown := [name for name in args.scenarios
+                    if name not in SCENARIOS]):
+        parser.error(f"unknown scenarios: {', '.join(unknown)} "
+                     f"(choose from {', '.join(SCENARIOS)})")
+
+    names = args.scenarios or list(SCENARIOS)
+    results = run_benchmarks({name: SCENARIOS[name] for name in names},
+                             args.frames, args.warmup, args.seed)
+    save_results(results, args.output)
+    for name, scenario in results["scenarios"].items():
+        print(f"{name:12} " + "  ".join(
+            f"{phase} p50/p95/p99: " + "/".join(
+                f"{scenario[phase][key]:.2f}" for key in ("p50", "p95", "p99"))
+            for phase in ("update", "render")) + " ms")
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        lines, regressions = compare_results(
+            load_results(args.compare), results, threshold=args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print("Regressions: " + ", ".join(
+                f"{name} ({phase})" for name, phase in regressions))
+            exit(1)
+
+
+if __name__ == '__main__':
+    main()
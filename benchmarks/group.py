@@ -0,0 +1,102 @@
+from core import Group
+import argparse
+import pygame
+import random
+import time
+
+
+class BenchmarkSprite(pygame.sprite.Sprite):
+    """Спрайт без изображения для замеров операций группы"""
+
+    def __init__(self, x, y, lifespan):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, 40, 15)
+        self.lifespan = lifespan
+        self.to_delete = False
+
+    def update(self):
+        self.lifespan -= 1
+        if self.lifespan <= 0:
+            self.to_delete = True
+
+    def collides(self, rect):
+        return self.rect.colliderect(rect)
+
+
+def create_sprites(amount, seed=0):
+    generator = random.Random(seed)
+    return [BenchmarkSprite(generator.randrange(0, 600),
+                            generator.randrange(-600, 600),
+                            generator.randrange(1, 3)) for _ in range(amount)]
+
+
+def measure(function, repeat, setup=None):
+    """функция для получения минимального времени выполнения (в мс),
+        результат setup передается в function и не входит в замер"""
+    best = float("inf")
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark_group(amount=10000, repeat=5, cell_size=None) -> dict:
+    """функция для замера основных операций группы из amount спрайтов
+        (cell_size включает пространственный индекс группы)"""
+
+    def create_group():
+        sprites = create_sprites(amount)
+        return Group(*sprites, cell_size=cell_size), sprites
+
+    def update_with_deletions(data):
+        # примерно половина спрайтов удаляется в одном кадре
+        group, _ = data
+        group.update()
+
+    def remove_all(data):
+        group, sprites = data
+        for sprite in sprites[::-1]:
+            group.remove(sprite)
+
+    def add_all(sprites):
+        group = Group()
+        for sprite in sprites:
+            group.add(sprite)
+
+    group, sprites = create_group()
+    target = BenchmarkSprite(280, 280, 1)
+    ignore = (sprites[0], None)
+    return {
+        "update + clear (50% deleted)": measure(
+            update_with_deletions, repeat, create_group),
+        "remove all": measure(remove_all, repeat, create_group),
+        "add all": measure(add_all, repeat, lambda: sprites),
+        "get_collisions": measure(
+            lambda _: group.get_collisions(target, ignore), repeat),
+        "get_rect_collisions": measure(
+            lambda _: group.get_rect_collisions(target.rect), repeat),
+        "index access": measure(
+            lambda _: [group[index] for index in range(0, amount, 10)],
+            repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замер операций core.Group на большом количестве спрайтов")
+    parser.add_argument("-n", "--amount", type=int, default=10000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-c", "--cell-size", type=int, default=128,
+                        help="размер ячейки для замеров с индексом")
+    args = parser.parse_args()
+    plain = benchmark_group(args.amount, args.repeat)
+    indexed = benchmark_group(args.amount, args.repeat, args.cell_size)
+    print(f"{'operation':30} {'plain':>12} {'spatial hash':>15}")
+    for name, value in plain.items():
+        print(f"{name:30} {value:9.3f} ms {indexed[name]:12.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
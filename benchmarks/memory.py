@@ -0,0 +1,115 @@
+from headless import init_headless
+import argparse
+import gc
+from randomness import rng
+import time
+import tracemalloc
+
+
+def measure_memory(factory, amount) -> tuple:
+    """функция для замера памяти, занятой amount объектами
+        (первый объект создается до замера, чтобы не учитывать загрузку
+        общих ресурсов класса; в результат входит и список объектов)"""
+    factory(0)
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(index) for index in range(amount)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, size
+
+
+class ObjectParticle():
+    """частица в виде отдельного объекта (так частицы хранились до
+        ParticleSystem, используется только для сравнения)"""
+    gravity = 0.2
+
+    def __init__(self, x, y, radius, color, lifespan=120, direction=1,
+                 momentum=3):
+        self.x = x
+        self.y = y
+        self.speed_x = rng.effects.random() * 5 * direction
+        self.color = color
+        self.momentum = momentum
+        self.radius = radius
+        self.lifespan = lifespan
+
+    def update(self):
+        self.radius -= rng.effects.random()
+        self.x += self.speed_x
+        self.momentum += self.gravity
+        self.y += self.momentum
+        self.lifespan -= 1
+
+
+def measure_update(objects, repeat=5) -> float:
+    """функция для замера минимального времени обновления объектов (в мс)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sprite in objects:
+            sprite.update()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def create_factories(size) -> dict:
+    """функция для создания фабрик объектов (импорт после инициализации,
+        так как объекты загружают изображения)"""
+    from core import Group
+    from enemies import Medusa
+    from items import BronzeCoin
+    from platforms import StaticPlatform
+
+    items = Group()
+    return {
+        "object per particle": lambda index: ObjectParticle(
+            index % size[0], index % size[1], 8, "white", lifespan=10 ** 9),
+        "StaticPlatform": lambda index: StaticPlatform(
+            index % size[0], -index, size),
+        "BronzeCoin": lambda index: BronzeCoin(
+            index % size[0], -index, size, 1),
+        "Medusa": lambda index: Medusa(
+            index % size[0], -index, size, items, 1),
+    }
+
+
+def measure_particle_system(amount) -> tuple:
+    """функция для замера памяти массивов ParticleSystem с amount частицами
+        и времени их обновления (в мс)"""
+    from particles import ParticleSystem
+    gc.collect()
+    tracemalloc.start()
+    system = ParticleSystem(max_particles=amount)
+    system.spawn(0, 0, 8, "white", amount, 1, 3, 10 ** 9)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, measure_update([system])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замер памяти и времени обновления игровых объектов")
+    parser.add_argument("-p", "--particles", type=int, default=10000)
+    parser.add_argument("-s", "--sprites", type=int, default=1000,
+                        help="количество платформ, монеток и врагов")
+    args = parser.parse_args()
+    size = (600, 600)
+    init_headless(*size)
+    amounts = {"object per particle": args.particles}
+    print(f"{'objects':24} {'amount':>7} {'total':>12} {'per object':>12} "
+          f"{'update':>10}")
+    for name, factory in create_factories(size).items():
+        amount = amounts.get(name, args.sprites)
+        objects, total = measure_memory(factory, amount)
+        update_time = measure_update(objects)
+        print(f"{name:24} {amount:7} {total / 1024:9.1f} KiB "
+              f"{total / amount:8.1f} B {update_time:7.2f} ms")
+    # частицы в игре хранятся в массивах ParticleSystem
+    total, update_time = measure_particle_system(args.particles)
+    print(f"{'ParticleSystem':24} {args.particles:7} {total / 1024:9.1f} KiB "
+          f"{total / args.particles:8.1f} B {update_time:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+from audio import voices
+from headless import create_level, init_headless
+import json
+from particles import glow_cache
+import platform
+import pygame
+import subprocess
+import time
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """функция для получения перцентиля (метод ближайшего ранга)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """функция для подсчета статистики по времени кадров (в миллисекундах)"""
+    result = {f"p{percent}": percentile(samples, percent) * 1000
+              for percent in PERCENTILES}
+    result["mean"] = sum(samples) / len(samples) * 1000 if samples else 0
+    result["max"] = max(samples) * 1000 if samples else 0
+    return result
+
+
+def run_scenario(display, setup, frames=600, warmup=60, seed=0):
+    """функция для замера времени обновления и отрисовки уровня в сценарии"""
+    level, _ = create_level(display, seed=seed)
+    level.prepare()
+    sustain = setup(level)
+    glow_cache.reset_stats()
+    update_times = []
+    render_times = []
+    particles = 0
+    for frame in range(warmup + frames):
+        # цикл заменяет GameScene.show, поэтому начало кадра отмечается здесь
+        voices.begin_frame()
+        level.frames_count = frame
+        sustain(level)
+        start = time.perf_counter()
+        level.handle_events()
+        level.update()
+        middle = time.perf_counter()
+        level.redraw(display)
+        end = time.perf_counter()
+        level.last_frame_time = end - start
+        if frame >= warmup:
+            update_times.append(middle - start)
+            render_times.append(end - middle)
+            particles += len(level.main_character.particles)
+    level.stop_sounds()
+    return {
+        "frames": frames,
+        "update": summarize(update_times),
+        "render": summarize(render_times),
+        "frame": summarize([update + render for update, render in zip(
+            update_times, render_times)]),
+        "average_particles": particles / frames if frames else 0,
+        "glow_cache": glow_cache.get_stats(),
+        "particles_scale": level.main_character.particles_governor.scale,
+        "particles_evicted": level.main_character.particles.evicted,
+    }
+
+
+def get_commit() -> str:
+    """функция для получения текущего коммита (для сравнения запусков)"""
+    try:
+        result = subprocess.run(("git", "rev-parse", "--short", "HEAD"),
+                                capture_output=True, text=True, check=True)
+    except Exception:
+        return "unknown"
+    return result.stdout.strip()
+
+
+def run_benchmarks(scenarios: dict, frames=600, warmup=60, seed=0) -> dict:
+    """функция для запуска набора сценариев"""
+    display = init_headless()
+    results = {}
+    for name, setup in scenarios.items():
+        results[name] = run_scenario(display, setup, frames, warmup, seed)
+    return {
+        "meta": {
+            "commit": get_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "frames": frames,
+            "warmup": warmup,
+            "seed": seed,
+        },
+        "scenarios": results,
+    }
+
+
+def save_results(results: dict, path: str):
+    with open(path, "w", encoding="u8") as f:
+        json.dump(results, f, indent=4)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="u8") as f:
+        return json.load(f)
+
+
+def compare_results(old: dict, new: dict, metric="p95", threshold=0.1):
+    """функция для поиска регрессий между двумя запусками
+        (возвращает строки отчета и список регрессий)"""
+    lines = []
+    regressions = []
+    for name, scenario in new["scenarios"].items():
+        if name not in old["scenarios"]:
+            continue
+        for phase in ("update", "render", "frame"):
+            before = old["scenarios"][name][phase][metric]
+            after = scenario[phase][metric]
+            ratio = after / before if before > 0 else 1
+            lines.append(f"{name:12} {phase:7} {metric}: {before:8.3f} ms -> "
+                         f"{after:8.3f} ms ({(ratio - 1) * 100:+.1f}%)")
+            if ratio > 1 + threshold:
+                regressions.append((name, phase))
+    return lines, regressions
@@ -0,0 +1,117 @@
+from enemies import Dragon, FlyingEye, Gin, Medusa
+from items import Hole, Jetpack, Rocket
+from randomness import rng
+
+# время жизни предметов в сценариях, чтобы они не исчезали во время замера
+ENDLESS_LIFESPAN = 10 ** 9
+
+
+def keep_alive(level):
+    """функция для удержания игрока на экране (автопилот для замеров)"""
+    player = level.main_character
+    player.game_over = False
+    if player.flying_object is None and player.v_momentum > 0 and player.screen_y > 350:
+        player.set_momentum(player.jum_height * 2)
+        level.scroll_down = True
+
+
+def attach_flying_item(level, item):
+    """функция для активации летающего предмета у игрока"""
+    level.items.add(item)
+    item.activate(level.main_character)
+    level.scroll_down = True
+
+
+def setup_baseline(level):
+    """обычная игра без предметов и врагов"""
+    return keep_alive
+
+
+def setup_rocket(level):
+    """активная ракета (40 светящихся частиц за кадр)"""
+    player = level.main_character
+    rocket = Rocket(player.x, player.y, level.size, level.volume_ratio,
+                    upgrade=(10, ENDLESS_LIFESPAN))
+    attach_flying_item(level, rocket)
+    return keep_alive
+
+
+def setup_jetpack(level):
+    """активный джетпак"""
+    player = level.main_character
+    jetpack = Jetpack(player.x, player.y, level.size, level.volume_ratio,
+                      upgrade=(3, ENDLESS_LIFESPAN))
+    attach_flying_item(level, jetpack)
+    return keep_alive
+
+
+def setup_holes(level, amount=5):
+    """несколько черных дыр на экране (каждая спавнит взрыв каждый кадр)"""
+    positions = [(50 + 110 * index, 80 + 90 * (index % 3))
+                 for index in range(amount)]
+
+    def sustain(level):
+        keep_alive(level)
+        holes = [item for item in level.items if isinstance(item, Hole)]
+        for x, y in positions[len(holes):]:
+            level.items.add(Hole(x, level.camera.y + y - 200, level.size,
+                                 level.volume_ratio))
+
+    for x, y in positions:
+        level.items.add(Hole(x, level.camera.y + y, level.size,
+                             level.volume_ratio))
+    return sustain
+
+
+def setup_enemies(level, amount=8):
+    """экран, заполненный врагами, и летящие в них пули"""
+    enemy_types = (Medusa, Gin, FlyingEye, Dragon)
+
+    def spawn_enemy(index, y):
+        enemy_type = enemy_types[index % len(enemy_types)]
+        enemy = enemy_type(rng.world.randrange(0, level.size[0]),
+                           level.camera.y + y, level.size, level.items,
+                           level.volume_ratio)
+        enemy.hp = ENDLESS_LIFESPAN
+        level.enemies.add(enemy)
+
+    def sustain(level):
+        keep_alive(level)
+        for index in range(len(level.enemies), amount):
+            spawn_enemy(index, -50)
+        player = level.main_character
+        player.reload_timer = 0
+        target = level.enemies[level.frames_count % len(level.enemies)]
+        player.shoot(target.rect.centerx,
+                     target.rect.centery - level.camera.y)
+
+    for index in range(amount):
+        spawn_enemy(index, 40 + index * 60)
+    return sustain
+
+
+def setup_late_chunks(level, period=30):
+    """генерация чанков в поздней игре с большими min_width/min_height"""
+    level.score = 25000
+    level.min_width = 325
+    level.min_height = 250
+    for _ in range(300):
+        level.update_coin_spawn()
+        level.update_enemies_spawn()
+
+    def sustain(level):
+        keep_alive(level)
+        if level.frames_count % period == 0:
+            level.chunck_height = level.size[1]
+
+    return sustain
+
+
+SCENARIOS = {
+    "baseline": setup_baseline,
+    "rocket": setup_rocket,
+    "jetpack": setup_jetpack,
+    "holes": setup_holes,
+    "enemies": setup_enemies,
+    "late_chunks": setup_late_chunks,
+}
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import pygame
+from resources import ATLAS_FOLDER, ATLAS_INDEX, natural_key
+
+# папки со спрайтами, которые упаковываются в атласы
+SOURCE_FOLDERS = ("assets/items", "assets/enemies", "assets/platforms",
+                  "assets/character")
+
+
+def find_sprites(folders=SOURCE_FOLDERS) -> list:
+    """функция для поиска всех png файлов в папках (с подпапками)"""
+    paths = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for name in sorted(files, key=natural_key):
+                if name.lower().endswith(".png"):
+                    paths.append(f"{root}/{name}".replace("\\", "/"))
+    return paths
+
+
+def pack(sizes: dict, page_size=1024, padding=1) -> dict:
+    """функция для раскладки прямоугольников по страницам атласа
+        полками (строками одной высоты), начиная с самых высоких
+        (путь -> (страница, x, y))"""
+    order = sorted(sizes, key=lambda path: (-sizes[path][1], path))
+    positions = {}
+    page, x, y, shelf_height = 0, 0, 0, 0
+    for path in order:
+        width, height = sizes[path]
+        if width > page_size or height > page_size:
+            raise ValueError(f"{path} does not fit into {page_size}px atlas")
+        if x + width > page_size:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        if y + height > page_size:
+            page, x, y, shelf_height = page + 1, 0, 0, 0
+        positions[path] = (page, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return positions
+
+
+def build(folders=SOURCE_FOLDERS, output=ATLAS_FOLDER, page_size=1024,
+          padding=1) -> dict:
+    """функция для сборки атласов и индекса регионов"""
+    images = {path: pygame.image.load(path) for path in find_sprites(folders)}
+    sizes = {path: image.get_size() for path, image in images.items()}
+    positions = pack(sizes, page_size, padding)
+    pages_amount = max((page for page, _, _ in positions.values()),
+                       default=-1) + 1
+    pages = [pygame.Surface((page_size, page_size), pygame.SRCALPHA)
+             for _ in range(pages_amount)]
+    regions = {}
+    for path, (page, x, y) in positions.items():
+        # BLEND_RGBA_MAX на прозрачной странице копирует пиксели без смешивания
+        pages[page].blit(images[path], (x, y),
+                         special_flags=pygame.BLEND_RGBA_MAX)
+        regions[path] = (page, x, y, *sizes[path])
+    os.makedirs(output, exist_ok=True)
+    names = []
+    for index, surface in enumerate(pages):
+        names.append(f"atlas{index}.png")
+        pygame.image.save(surface, f"{output}/{names[-1]}")
+    index = {"pages": names, "regions": regions}
+    with open(f"{output}/{os.path.basename(ATLAS_INDEX)}", "w",
+              encoding="u8") as f:
+        json.dump(index, f)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Упаковка спрайтов из assets в атласы")
+    parser.add_argument("-s", "--page-size", type=int, default=1024,
+                        help="размер стороны одной страницы атласа")
+    parser.add_argument("-o", "--output", default=ATLAS_FOLDER)
+    args = parser.parse_args()
+    index = build(output=args.output, page_size=args.page_size)
+    print(f"Packed {len(index['regions'])} sprites into "
+          f"{len(index['pages'])} atlas pages in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from randomness import rng
+
+
+class ChunkPlanner():
+    """Класс для подготовки раскладки следующего чанка заранее
+        (за шаг симуляции планируется одна строка платформ, а в шаг
+        спавна чанка остается только создать спрайты по раскладке)"""
+
+    def __init__(self, level):
+        self.level = level
+        # (тип платформы, x, y от начала чанка, тип предмета или None)
+        self.layout = []
+        self.total_height = None  # высота уже спланированных строк
+        self.ready = False
+        self.planned_rows = 0
+        # строки, которые не успели спланировать заранее
+        self.forced_rows = 0
+
+    def plan_row(self):
+        """метод для планирования одной строки платформ"""
+        level = self.level
+        if self.total_height is None:
+            self.total_height = rng.world.randrange(-50, 100)
+        total_width = rng.world.randrange(-50, 100)
+        height = rng.world.randrange(level.min_height, level.min_height * 2)
+        while total_width < level.size[0]:
+            width = rng.world.randrange(level.min_width, level.min_width * 2)
+            y_offset = rng.world.randrange(-level.min_height, level.min_height)
+            level.plan_platform(
+                total_width, self.total_height + y_offset, self.layout)
+            total_width += width
+        self.total_height += height
+        self.planned_rows += 1
+        if self.total_height >= level.size[1]:
+            self.ready = True
+            # следующий чанк становится сложнее
+            level.min_width += 1
+            level.min_height += 1
+
+    def step(self):
+        """метод для планирования очередной строки (вызывается каждый шаг)"""
+        if not self.ready:
+            self.plan_row()
+
+    def take(self) -> list:
+        """метод для получения готовой раскладки чанка
+            (недостающие строки планируются сразу)"""
+        while not self.ready:
+            self.plan_row()
+            self.forced_rows += 1
+        layout = self.layout
+        self.reset()
+        return layout
+
+    def reset(self):
+        self.layout = []
+        self.total_height = None
+        self.ready = False
+
+    def get_stats(self) -> dict:
+        return {
+            "planned_rows": self.planned_rows,
+            "forced_rows": self.forced_rows,
+        }
@@ -1,11 +1,55 @@
-import json
+from audio import voices
+from profiler import profiler
 import pygame
-import random
+from resources import assets
+from storage import save_store
+import time
+
+
+class Camera():
+    """Класс камеры уровня: объекты хранят мировые координаты,
+        а камера - мировую координату верхней границы экрана"""
+
+    def __init__(self):
+        self.y = 0
+        # положение камеры до последнего шага симуляции и положение,
+        # с которым рисуется кадр (между ними при отрисовке)
+        self.previous_y = 0
+        self.view_y = 0
+
+    def move(self, offset: int):
+        """метод для сдвига камеры по вертикали"""
+        self.y += offset
+
+    def store(self):
+        """метод для запоминания положения перед шагом симуляции"""
+        self.previous_y = self.y
+
+    def interpolate(self, alpha: float) -> int:
+        """метод для расчета положения камеры для отрисовки
+            (alpha - доля шага симуляции, прошедшая после последнего шага)"""
+        self.view_y = round(
+            self.previous_y + (self.y - self.previous_y) * alpha)
+        return self.view_y
+
+    def to_screen(self, rect: pygame.Rect) -> tuple[int, int]:
+        """метод для перевода мировых координат ректа в экранные"""
+        return rect.x, rect.y - self.y
+
+    def reset(self):
+        self.y = 0
+        self.previous_y = 0
+        self.view_y = 0
+
+
+camera = Camera()
 
 
 class GameObject(pygame.sprite.Sprite):
     """Абстрактный класс для игровых объектов"""
+    VOLUME_KEY = "volume"
     object_id = 0
+    camera = camera
 
     def __init__(self, screen_size):
         super().__init__()
@@ -13,7 +57,8 @@ class GameObject(pygame.sprite.Sprite):
         self._id = GameObject.object_id
         GameObject.object_id += 1
         self.to_delete = False
-        self.VOLUME_KEY = "volume"
+        # объект лежит в пуле и не должен использоваться (см. pool.py)
+        self.in_pool = False
 
     def update(self):
         """метод для обновления положения объекта"""
@@ -31,6 +76,11 @@ class GameObject(pygame.sprite.Sprite):
         """метод для изменения позиции объекта"""
         self.rect.topleft = pos
 
+    def reset(self, *args, **kwargs):
+        """метод для сброса объекта перед повторным использованием из пула
+            (принимает те же аргументы, что и конструктор)"""
+        self.to_delete = False
+
     def delete(self, *args, **kwargs):
         """метод для удаления спарйта из группы"""
         self.to_delete = True
@@ -41,17 +91,8 @@ class GameObject(pygame.sprite.Sprite):
         pass
 
     def get_game_value(self, key):
-        """метод для получения значения из файла игровых сохранений"""
-        try:
-            with open("values.json", "r", encoding="u8") as f:
-                data = json.load(f)
-        except Exception as err:
-            print(err)
-            result = -1
-        else:
-            result = data.get(key, -1)
-        finally:
-            return result
+        """метод для получения значения из игровых сохранений"""
+        return save_store.get(key)
 
     def __eq__(self, other):
         """метод для сравнения спрайтов"""
@@ -73,6 +114,11 @@ class GameObject(pygame.sprite.Sprite):
     def y(self) -> int:
         return self.rect.y
 
+    @property
+    def screen_y(self) -> int:
+        """метод для получения координаты объекта на экране"""
+        return self.rect.y - self.camera.y
+
     @property
     def top(self) -> int:
         return self.rect.top
@@ -89,65 +135,152 @@ class StaticGameObject(GameObject):
                  load_image=True):
         super().__init__(screen_size)
         if load_image:
-            if convert_alpha:
-                self.image = pygame.image.load(image_path).convert_alpha()
-            else:
-                self.image = pygame.image.load(image_path).convert()
+            self.image = assets.image(image_path, convert_alpha)
         self.rect = self.image.get_rect()
         self.rect.topleft = (x, y)
 
+    def reset(self, x, y, *args, **kwargs):
+        super().reset()
+        self.rect.topleft = (x, y)
+
 
 class AnimatedGameObject(GameObject):
-    """Абстрактный класс для создания анимированных игровых объеков"""
+    """Абстрактный класс для создания анимированных игровых объеков
+        (каждый кадр хранится один раз, а порядок и длительность кадров
+        задаются таблицей индексов frame_table, отраженные по горизонтали
+        кадры создаются один раз при загрузке)"""
     images = None
+    mirrored_images = None
     static_image = None
+    frame_table = None
 
     def __init__(self, x, y, images, screen_size, convert_alpha=True,
-                 create_static=True, colorkey=None):
+                 create_static=True, colorkey=None, frame_repeat=1):
         super().__init__(screen_size)
         self.__class__.load_images(
-            images, convert_alpha, create_static, colorkey)
-        self.image = self.images[0]
+            images, convert_alpha, create_static, colorkey, frame_repeat)
+        self.image = self.images[self.frame_table[0]]
         self.rect = self.image.get_rect()
         self.rect.topleft = (x, y)
         self.current_frame = 0
-        self.frames_amount = len(self.images)
+        self.frames_amount = len(self.frame_table)
+        # использовать отраженные кадры анимации
+        self.mirrored = False
+
+    def reset(self, x, y, *args, **kwargs):
+        super().reset()
+        self.current_frame = 0
+        self.mirrored = False
+        self.image = self.images[self.frame_table[0]]
+        self.rect = self.image.get_rect()
+        self.rect.topleft = (x, y)
 
     @classmethod
-    def load_images(cls, images, convert_alpha=True, create_static=True, colorkey=None):
-        """метод для загрузки анимации спрайта"""
+    def load_images(cls, images, convert_alpha=True, create_static=True,
+                    colorkey=None, frame_repeat=1):
+        """метод для загрузки анимации спрайта
+            (первое изображение становится статичным при create_static,
+            остальные показываются по frame_repeat кадров игры каждое)"""
         if cls.images is None:
-            if convert_alpha:
-                cls.images = [pygame.image.load(
-                    image).convert_alpha() for image in images]
-            else:
-                cls.images = [pygame.image.load(
-                    image).convert() for image in images]
-            cls.set_colorkey(colorkey)
+            paths = list(images)
             if create_static and cls.static_image is None:
-                cls.static_image = cls.images.pop(0)
+                cls.static_image = assets.image(paths.pop(0), convert_alpha)
+            # номер уникального кадра по пути
+            indices = {path: index for index, path
+                       in enumerate(dict.fromkeys(paths))}
+            cls.images = assets.load_images(indices, convert_alpha)
+            cls.frame_table = tuple(indices[path] for path in paths
+                                    for _ in range(frame_repeat))
+            cls.set_colorkey(colorkey)
+            cls.mirrored_images = [pygame.transform.flip(image, True, False)
+                                   for image in cls.images]
 
     @classmethod
     def set_colorkey(cls, colorkey):
         if colorkey is not None:
+            images = cls.images
+            if cls.static_image is not None:
+                images = images + [cls.static_image]
             if colorkey == -1:
-                for image in cls.images:
+                for image in images:
                     image.set_colorkey(image.get_at((5, 5)))
             else:
-                for image in cls.images:
+                for image in images:
                     image.set_colorkey(colorkey)
 
+    def get_frames(self) -> list:
+        """метод для получения кадров анимации с учетом отражения"""
+        return self.mirrored_images if self.mirrored else self.images
+
+    def set_mirrored(self, state: bool):
+        """метод для отражения текущего кадра без пересоздания изображений"""
+        if self.mirrored != state:
+            self.mirrored = state
+            self.image = self.get_frames()[self.frame_table[self.current_frame]]
+
     def update(self, skip_frames=1):
         position = self.pos
         self.current_frame = (
             self.current_frame + skip_frames) % self.frames_amount
-        self.image = self.images[self.current_frame]
+        self.image = self.get_frames()[self.frame_table[self.current_frame]]
         self.rect = self.image.get_rect()
         self.set_pos(position)
 
 
+class RotationCache():
+    """Класс для хранения заранее повернутых изображений для углов,
+        кратных step (вместе со смещением для отрисовки по центру)"""
+
+    def __init__(self, step=12):
+        self.step = step
+        # id изображения -> (изображение, {угол: (поворот, смещение)})
+        self.rotations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, angle: float) -> int:
+        """метод для округления угла до ключа кэша"""
+        return round(angle / self.step) * self.step % 360
+
+    def create_rotation(self, image: pygame.Surface, angle: int) -> tuple:
+        rotated = pygame.transform.rotate(image, angle)
+        return rotated, (-rotated.get_width() // 2,
+                         -rotated.get_height() // 2)
+
+    def build(self, images):
+        """метод для поворота изображений на все углы заранее"""
+        for image in images:
+            _, table = self.rotations.setdefault(id(image), (image, {}))
+            for angle in range(0, 360, self.step):
+                if angle not in table:
+                    table[angle] = self.create_rotation(image, angle)
+
+    def get(self, image: pygame.Surface, angle: float) -> tuple:
+        """метод для получения повернутого изображения и смещения
+            его левого верхнего угла относительно точки поворота"""
+        key = self.quantize(angle)
+        _, table = self.rotations.setdefault(id(image), (image, {}))
+        if (result := table.get(key)) is None:
+            self.misses += 1
+            result = self.create_rotation(image, key)
+            table[key] = result
+        else:
+            self.hits += 1
+        return result
+
+
 class GameScene():
     """Абстрактный класс для игровой сцены/меню"""
+    # манифест ресурсов сцены, загружаемых до ее запуска
+    # (формат описан в AssetManager.preload)
+    ASSETS = {}
+    # режим грязных прямоугольников: кадр перерисовывается и выводится
+    # на экран только в областях, отмеченных через mark_dirty
+    DIRTY_RECTS = False
+    # частота шагов симуляции (не зависит от частоты отрисовки)
+    TICK_RATE = 60
+    # максимум шагов за один кадр, чтобы долгий кадр не копил отставание
+    MAX_STEPS = 5
 
     def __init__(self, display: pygame.Surface, manager, fps=60):
         # на принятой поверхности происхоит отрисовка сцены
@@ -171,52 +304,165 @@ class GameScene():
         self.JUMP_KEY = "jump"
         self.ROCKET_KEY = "rocket"
         self.VOLUME_KEY = "volume"
+        # параметры запуска без окна (для тестов производительности)
+        self.headless = False
+        self.render = True
+        self.frames_limit = None
+        self.frames_count = 0
+        # фиксированный шаг симуляции и накопленное, но не отработанное время
+        self.timestep = 1 / self.TICK_RATE
+        self.accumulator = 0
+        self.steps_count = 0
+        # доля шага для интерполяции положений при отрисовке [0; 1]
+        self.alpha = 1
+        self.run_time = 0
+        # время работы последнего кадра без ожидания clock.tick
+        self.last_frame_time = 0
+        # измененные области экрана для режима DIRTY_RECTS
+        self.dirty_rects = []
+        self.full_redraw = True
+        self.preload_assets()
+
+    def preload_assets(self):
+        """метод для загрузки ресурсов из манифеста сцены"""
+        assets.preload(self.ASSETS)
 
     def redraw(self, win: pygame.Surface):
         """метод для отрисовки на заданной поверхности"""
         pass
 
     def handle_events(self):
-        """метод для обработки событий внутри сцены"""
+        """метод для обработки событий внутри сцены (один раз за кадр)"""
         pass
 
+    def update(self):
+        """метод для одного шага симуляции длиной timestep"""
+        pass
+
+    def run_steps(self, elapsed: float):
+        """метод для выполнения шагов симуляции за прошедшее время"""
+        self.accumulator = min(self.accumulator + elapsed,
+                               self.timestep * self.MAX_STEPS)
+        while self.running and self.accumulator >= self.timestep:
+            self.update()
+            self.steps_count += 1
+            self.accumulator -= self.timestep
+        self.alpha = min(self.accumulator / self.timestep, 1)
+
     def close(self):
         """метод для закрытия сцены"""
         self.running = False
 
+    def mark_dirty(self, rect=None):
+        """метод для отметки области, которую нужно перерисовать
+            (без аргумента перерисовывается весь экран)"""
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.dirty_rects.append(pygame.Rect(rect))
+
+    def draw_frame(self):
+        """метод для отрисовки кадра и вывода его на экран"""
+        if not self.DIRTY_RECTS or profiler.overlay:
+            with profiler.phase("redraw"):
+                self.redraw(self.display)
+            if profiler.overlay:
+                profiler.draw(self.display)
+            if not self.headless:
+                with profiler.phase("display.update"):
+                    pygame.display.update()
+            # после выключения оверлея экран перерисовывается целиком
+            self.full_redraw = True
+            return
+        if self.full_redraw:
+            rects = None
+        elif self.dirty_rects:
+            rects = self.dirty_rects
+        else:
+            return
+        with profiler.phase("redraw"):
+            if rects is not None:
+                # сцена рисуется целиком, но изменяются только пиксели
+                # внутри отмеченных областей
+                self.display.set_clip(rects[0].unionall(rects[1:]))
+            self.redraw(self.display)
+            self.display.set_clip(None)
+        if not self.headless:
+            with profiler.phase("display.update"):
+                if rects is None:
+                    pygame.display.update()
+                else:
+                    pygame.display.update(rects)
+        self.full_redraw = False
+        self.dirty_rects = []
+
     def show(self):
         """метод для запуска сцены"""
         self.running = True
+        self.frames_count = 0
+        self.steps_count = 0
+        self.accumulator = 0
+        # экран мог измениться другой сценой
+        self.mark_dirty()
+        start_time = time.perf_counter()
+        previous_time = start_time
         while self.running:
-            self.handle_events()
-            self.redraw(self.display)
-            pygame.display.update()
-            self.clock.tick(self.FPS)
+            frame_start = time.perf_counter()
+            profiler.start_frame()
+            voices.begin_frame()
+            if self.DIRTY_RECTS and pygame.event.peek(
+                    (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)):
+                self.mark_dirty()
+            with profiler.phase("handle_events"):
+                self.handle_events()
+            with profiler.phase("update"):
+                if self.headless:
+                    # без окна ровно один шаг за итерацию: результат не
+                    # зависит от скорости машины
+                    self.run_steps(self.timestep)
+                    self.alpha = 1
+                else:
+                    self.run_steps(frame_start - previous_time)
+            previous_time = frame_start
+            if self.render:
+                self.draw_frame()
+            self.frames_count += 1
+            if self.headless:
+                self.last_frame_time = time.perf_counter() - frame_start
+                if self.frames_limit is not None and self.frames_count >= self.frames_limit:
+                    self.close()
+            else:
+                self.last_frame_time = time.perf_counter() - frame_start
+                with profiler.phase("idle"):
+                    # время до следующего кадра менеджер может потратить
+                    # на подготовку следующих сцен
+                    self.manager.idle(self)
+                with profiler.phase("clock.tick"):
+                    self.clock.tick(self.FPS)
+            profiler.end_frame()
+        self.run_time = time.perf_counter() - start_time
+
+    def set_headless(self, state: bool, frames_limit=None, render=True):
+        """метод для запуска сцены без ограничения FPS и обновления экрана
+            (render=False отключает и отрисовку кадров)"""
+        self.headless = state
+        self.frames_limit = frames_limit
+        self.render = render or not state
+
+    def get_fps(self) -> float:
+        """метод для получения среднего FPS последнего запуска сцены"""
+        if self.run_time > 0:
+            return self.frames_count / self.run_time
+        return 0
 
     def set_game_value(self, key, new_value):
-        """метод для обновления файла с игровыми сохранениями"""
-        try:
-            with open("values.json", "r+", encoding="u8") as f:
-                data = json.load(f)
-                data[key] = new_value
-                f.seek(0)
-                json.dump(data, f)
-                f.truncate()
-        except Exception as err:
-            print(err)
+        """метод для обновления игровых сохранений (запись в файл
+            происходит в фоне)"""
+        save_store.set(key, new_value)
 
     def get_game_value(self, key):
-        """метод для получения значения из файла игровых сохранений"""
-        try:
-            with open("values.json", "r", encoding="u8") as f:
-                data = json.load(f)
-        except Exception as err:
-            print(err)
-            result = -1
-        else:
-            result = data.get(key, -1)
-        finally:
-            return result
+        """метод для получения значения из игровых сохранений"""
+        return save_store.get(key)
 
     def update_sound_volume(self):
         """метод для обновления громкости звуков сцены"""
@@ -225,11 +471,7 @@ class GameScene():
 
     def load_upgrades_levels(self):
         """метод для получения уровней предметов"""
-        try:
-            with open("values.json", "r", encoding="u8") as f:
-                data = json.load(f)
-        except Exception as err:
-            print(err)
+        if (data := save_store.get_data()) is None:
             self.set_default_levels()
         else:
             self.set_levels_from_data(data)
@@ -256,146 +498,314 @@ class GameScene():
         self.jump_level = data.get(self.JUMP_KEY)
         self.rocket_level = data.get(self.ROCKET_KEY)
 
+    def get_levels_data(self) -> dict:
+        """метод для получения уровней предметов в формате сохранений"""
+        return {
+            self.MAGNET_KEY: self.magnet_level,
+            self.SHIELD_KEY: self.shield_level,
+            self.HAT_KEY: self.hat_level,
+            self.JETPACK_KEY: self.jetpack_level,
+            self.DAMAGE_KEY: self.damage_level,
+            self.RELOAD_KEY: self.reload_level,
+            self.JUMP_KEY: self.jump_level,
+            self.ROCKET_KEY: self.rocket_level,
+        }
+
+
+class SceneRegistry():
+    """Класс для создания сцен при первом обращении к ним
+        (время создания каждой сцены сохраняется для отчета о запуске,
+        on_create(имя, сцена) вызывается для каждой созданной сцены)"""
+
+    def __init__(self, display: pygame.Surface, manager, fps=60,
+                 on_create=None):
+        self.display = display
+        self.manager = manager
+        self.fps = fps
+        self.on_create = on_create
+        self.scene_types = {}  # имя -> класс сцены
+        self.scenes = {}  # имя -> созданная сцена
+        self.timings = {}  # имя -> время создания в секундах
+
+    def register(self, name: str, scene_type):
+        self.scene_types[name] = scene_type
+
+    def get(self, name: str) -> GameScene:
+        """метод для получения сцены (создается при первом обращении)"""
+        if (scene := self.scenes.get(name)) is None:
+            start = time.perf_counter()
+            scene = self.scene_types[name](self.display, self.manager, self.fps)
+            self.timings[name] = time.perf_counter() - start
+            self.scenes[name] = scene
+            if self.on_create is not None:
+                self.on_create(name, scene)
+        return scene
+
+    def get_loaded(self, name: str):
+        """метод для получения сцены без ее создания (None, если ее нет)"""
+        return self.scenes.get(name)
+
+    def warm_up(self, names):
+        """метод для заблаговременного создания первой еще не созданной
+            сцены из names (возвращает ее имя или None)"""
+        for name in names:
+            if name not in self.scenes:
+                self.get(name)
+                return name
+        return None
+
+
+class SpatialHash():
+    """Класс для разбиения плоскости на ячейки и быстрого поиска объектов
+        рядом с заданным прямоугольником или точкой"""
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (x, y) ячейки -> ключи объектов
+        self.bounds = {}  # ключ объекта -> занимаемые им ячейки
+
+    def get_bounds(self, rect: pygame.Rect) -> tuple:
+        """метод для получения диапазона ячеек, которые покрывает рект"""
+        size = self.cell_size
+        left, top = rect.left // size, rect.top // size
+        return (left, top, max(left, (rect.right - 1) // size),
+                max(top, (rect.bottom - 1) // size))
+
+    def insert(self, key, rect: pygame.Rect):
+        """метод для добавления объекта в ячейки"""
+        bounds = self.get_bounds(rect)
+        self.bounds[key] = bounds
+        left, top, right, bottom = bounds
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                if (cell := self.cells.get((x, y))) is None:
+                    self.cells[(x, y)] = {key}
+                else:
+                    cell.add(key)
+
+    def remove(self, key):
+        """метод для удаления объекта из ячеек"""
+        if (bounds := self.bounds.pop(key, None)) is None:
+            return
+        left, top, right, bottom = bounds
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                cell = self.cells[(x, y)]
+                cell.discard(key)
+                if not cell:
+                    del self.cells[(x, y)]
+
+    def move(self, key, rect: pygame.Rect):
+        """метод для обновления ячеек объекта после его перемещения"""
+        if self.get_bounds(rect) != self.bounds.get(key):
+            self.remove(key)
+            self.insert(key, rect)
+
+    def query(self, rect: pygame.Rect) -> set:
+        """метод для получения ключей объектов из ячеек под ректом"""
+        left, top, right, bottom = self.get_bounds(rect)
+        if left == right and top == bottom:
+            return set(self.cells.get((left, top), ()))
+        result = set()
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                if (cell := self.cells.get((x, y))) is not None:
+                    result.update(cell)
+        return result
 
-class Group():
-    """Кастомный класс для организации спрайтов"""
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
 
-    def __init__(self, *sprites):
-        self.sprites = list(sprites)
+
+class Group():
+    """Кастомный класс для организации спрайтов
+        (спрайты хранятся в словаре по id в порядке добавления, поэтому
+        удаление спрайта не требует поиска по группе; при указании
+        cell_size поиск столкновений идет только по соседним ячейкам)"""
+
+    def __init__(self, *sprites, cell_size=None, on_remove=None):
+        self.sprites = {}
+        # обработчик спрайтов, удаленных из группы (например, возврат в пул)
+        self.on_remove = on_remove
+        # список спрайтов для доступа по индексу, пересоздается при изменениях
+        self.sprites_list = None
+        # спрайты, добавленные во время обновления группы
+        self.pending = []
+        # ключи спрайтов, удаленных через remove во время обновления
+        self.removed = []
+        self.updating = False
+        self.index = SpatialHash(cell_size) if cell_size else None
+        # порядок добавления спрайтов (для сортировки найденных в ячейках)
+        self.order = {}
+        self.counter = 0
+        for sprite in sprites:
+            self.raw_add(sprite)
 
     def update(self, *args, **kwargs):
-        """метод для обновления спрайтов"""
-        for sprite in self.sprites:
-            sprite.update(*args, **kwargs)
+        """метод для обновления спрайтов и удаления помеченных
+            (удаление идет после всего прохода, так как спрайт может
+            пометить к удалению уже обновленный спрайт)"""
+        index = self.index
+        sprites = self.sprites
+        self.updating = True
+        try:
+            # перебирается снимок: спрайт может изменить группу в update
+            for sprite in self.get_list():
+                sprite.update(*args, **kwargs)
+                if index is not None and (key := id(sprite)) in sprites:
+                    index.move(key, sprite.rect)
+        finally:
+            self.updating = False
+        if self.removed:
+            removed, self.removed = self.removed, []
+            self.delete_keys([key for key in dict.fromkeys(removed)
+                              if key in sprites])
         self.clear_sprites()
+        self.add_pending()
 
     def add(self, sprite: pygame.sprite.Sprite):
         """метод для добавления спрайта в группу"""
         if isinstance(sprite, pygame.sprite.Sprite):
-            self.sprites.append(sprite)
+            self.raw_add(sprite)
         else:
             raise TypeError("Wrong type for argument")
 
     def raw_add(self, sprite):
         """метод для добавления объектов, не наследующихся от спрайта"""
-        self.sprites.append(sprite)
+        if self.updating:
+            self.pending.append(sprite)
+        else:
+            self.insert(sprite)
+
+    def insert(self, sprite):
+        """метод для добавления спрайта в словарь и в ячейки"""
+        key = id(sprite)
+        self.sprites[key] = sprite
+        self.sprites_list = None
+        if self.index is not None:
+            self.order[key] = self.counter
+            self.counter += 1
+            self.index.remove(key)
+            self.index.insert(key, sprite.rect)
+
+    def add_pending(self):
+        """метод для добавления спрайтов, отложенных во время обновления"""
+        if self.pending:
+            pending, self.pending = self.pending, []
+            for sprite in pending:
+                self.insert(sprite)
 
     def raw_draw(self, win):
         """метод для отрисовки объектов, если у них есть метод draw(self, win)"""
-        for sprite in self.sprites:
+        for sprite in self.sprites.values():
             sprite.draw(win)
 
     def remove(self, sprite: pygame.sprite.Sprite):
-        """метод для удаления спрайта из группы"""
+        """метод для удаления спрайта из группы
+            (во время обновления группы удаление откладывается до конца
+            прохода)"""
         if isinstance(sprite, pygame.sprite.Sprite):
-            for index, value in tuple(enumerate(self.sprites))[::-1]:
-                if sprite == value:
-                    self.sprites.pop(index)
-                    break
+            if id(sprite) in self.sprites:
+                if self.updating:
+                    self.removed.append(id(sprite))
+                else:
+                    self.delete_keys((id(sprite),))
+            elif self.updating and sprite in self.pending:
+                self.pending.remove(sprite)
+                if self.on_remove is not None:
+                    self.on_remove(sprite)
         else:
             raise TypeError("Wrong type for argument")
 
+    def delete_keys(self, keys):
+        """метод для удаления спрайтов по их ключам"""
+        if keys:
+            for key in keys:
+                sprite = self.sprites.pop(key)
+                if self.on_remove is not None:
+                    self.on_remove(sprite)
+                if self.index is not None:
+                    self.index.remove(key)
+                    del self.order[key]
+            self.sprites_list = None
+
     def clear_sprites(self):
         """метод для удаления помеченных спрайтов"""
-        for index, sprite in tuple(enumerate(self.sprites))[::-1]:
-            if sprite.to_delete:
-                self.sprites.pop(index)
-
-    def draw(self, win, sort=None):
-        """метод для отрисовки спрайтов из группы"""
-        sprites = self.sprites if sort is None else sorted(
-            self.sprites, key=sort)
-        for sprite in sprites:
-            win.blit(sprite.image, sprite.rect)
+        self.delete_keys([key for key, sprite in self.sprites.items()
+                          if sprite.to_delete])
+
+    def draw(self, win, sort=None, offset=0):
+        """метод для отрисовки спрайтов из группы
+            (offset - вертикальный сдвиг камеры)"""
+        sprites = self.sprites.values() if sort is None else sorted(
+            self.sprites.values(), key=sort)
+        if offset:
+            for sprite in sprites:
+                rect = sprite.rect
+                win.blit(sprite.image, (rect.x, rect.y - offset))
+        else:
+            for sprite in sprites:
+                win.blit(sprite.image, sprite.rect)
 
     def clear(self):
         """Метод для удаления всех спрайтов из группы"""
+        if self.on_remove is not None:
+            for sprite in (*self.sprites.values(), *self.pending):
+                self.on_remove(sprite)
         self.sprites.clear()
+        self.pending.clear()
+        self.removed.clear()
+        self.sprites_list = None
+        if self.index is not None:
+            self.index.clear()
+            self.order.clear()
+
+    def get_nearby(self, keys):
+        """метод для получения спрайтов по ключам в порядке добавления"""
+        if len(keys) > 1:
+            keys = sorted(keys, key=self.order.__getitem__)
+        return [self.sprites[key] for key in keys]
 
     def get_collisions(self, target, ignore=None):
         """метод для получения спрайтов, с которыми столкнулся предеанный объект"""
+        sprites = self.sprites.values() if self.index is None else \
+            self.get_nearby(self.index.query(target.rect))
         if ignore is None:
-            return [sprite for sprite in self.sprites if target.collides(
-                sprite.rect)]
+            return [sprite for sprite in sprites
+                    if target.collides(sprite.rect)]
         else:
-            ignore = [el for el in ignore if el is not None]
-            return [sprite for sprite in self.sprites if target.collides(
-                sprite.rect) and sprite not in ignore]
+            ignore = {id(el) for el in ignore if el is not None}
+            return [sprite for sprite in sprites
+                    if target.collides(sprite.rect) and id(sprite) not in ignore]
 
     def get_rect_collisions(self, rect):
         """метод для получения коллизий ректа со спрайтами в группе"""
-        return [sprite for sprite in self.sprites if rect.colliderect(sprite.rect)]
+        sprites = self.sprites.values() if self.index is None else \
+            self.get_nearby(self.index.query(rect))
+        return [sprite for sprite in sprites if rect.colliderect(sprite.rect)]
+
+    def get_list(self) -> list:
+        """метод для получения списка спрайтов (пересоздается только после
+            изменения группы)"""
+        if self.sprites_list is None:
+            self.sprites_list = list(self.sprites.values())
+        return self.sprites_list
 
     def __getitem__(self, index):
         try:
-            return self.sprites[index]
+            return self.get_list()[index]
         except IndexError:
             raise IndexError(f"Wrong index supplied: {index}")
 
-    def __len__(self):
-        return len(self.sprites)
-
-
-class Particle():
-    """класс для создания частицы"""
-
-    def __init__(self, x, y, radius, color, lifespan=120, direction=1, momentum=3):
-        self.x_pos = x
-        self.y_pos = y
-        self.speed_x = random.random() * 5 * direction
-        self.color = color
-        self.gravity = 0.2
-        self.v_momentum = momentum
-        self.radius = radius
-        self.lifespan = lifespan
-        self.to_delete = False
+    def __iter__(self):
+        # перебирается снимок списка, поэтому группу можно изменять
+        # во время перебора
+        return iter(self.get_list())
 
-    def draw(self, win):
-        if self.lifespan > 0 and self.radius > 0:
-            pygame.draw.circle(
-                win, self.color, (self.x_pos, self.y_pos), self.radius)
+    def __contains__(self, sprite):
+        return id(sprite) in self.sprites
 
-    def update(self):
-        self.radius -= random.random()
-        self.x_pos += self.speed_x
-        self.v_momentum += self.gravity
-        self.y_pos += self.v_momentum
-        self.lifespan -= 1
-        if self.lifespan <= 0 or self.radius <= 0:
-            self.to_delete = True
-
-
-class GlowingParticle():
-    """Класс для создания светящихся частиц"""
-
-    def __init__(self, x, y, radius, lifespan=120, direction=1, momentum=3):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.lifespan = lifespan
-        self.direction = direction
-        self.v_momentum = momentum
-        self.speed_x = random.random() * 5 * direction
-        self.gravity = 0.2
-        self.to_delete = False
-        self.create_image()
-
-    def update(self):
-        self.x += self.speed_x
-        self.v_momentum += self.gravity
-        self.y += self.v_momentum
-        self.lifespan -= 1
-        self.radius -= random.random()
-        if self.lifespan <= 0 or self.radius <= 0:
-            self.to_delete = True
-        else:
-            self.create_image()
-
-    def draw(self, win):
-        win.blit(self.image, (self.x - self.radius, self.y - self.radius),
-                 special_flags=pygame.BLEND_RGB_ADD)
+    def __len__(self):
+        return len(self.sprites)
 
-    def create_image(self):
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2))
-        pygame.draw.circle(self.image, (20, 20, 20),
-                           (self.radius, self.radius), self.radius)
@@ -1,17 +1,24 @@
+from audio import voices
 from core import AnimatedGameObject
 from items import HoloCoin
-import os
-import pygame
+from pool import pools
+from resources import assets
 
 
 class Enemy(AnimatedGameObject):
     """Абстрактный класс для противника"""
+    blood_colors = ((254, 132, 132), (254, 92, 92), (254, 32, 32),
+                    (186, 0, 0), (107, 0, 0), (83, 0, 0))
     sound = None
     damage_sound = None
     death_sound = None
 
     def __init__(self, x, y, images, screen_size, group, sound, volume,
-                 ratio=1, convert_alpha=True):
+                 ratio=1, convert_alpha=True, frame_repeat=1):
+        # первый кадр анимации отделяется как статичное изображение, а его
+        # оставшиеся повторы остаются в цикле (повторы путей хранятся
+        # как один кадр)
+        images = [path for path in images for _ in range(frame_repeat)]
         super().__init__(x, y, images, screen_size, convert_alpha)
         self.volume = volume
         self.volume_ratio = ratio
@@ -20,18 +27,28 @@ class Enemy(AnimatedGameObject):
         self.sound_timer = 0
         self.sound_reload = 0.02
         self.group = group
-        self.horizontal_speed = 4
-        self.hp = 100
+        self.set_stats()
         self.reward = 50
         self.facing_right = True
-        self.blood_colors = ((254, 132, 132), (254, 92, 92), (254, 32, 32),
-                             (186, 0, 0), (107, 0, 0), (83, 0, 0))
+
+    def set_stats(self):
+        """метод для установки начальных скорости и здоровья
+            (при создании и при повторном использовании из пула)"""
+        self.horizontal_speed = 4
+        self.hp = 100
+
+    def reset(self, x, y, screen_size, group, ratio):
+        super().reset(x, y)
+        self.volume_ratio = ratio
+        self.sound_timer = 0
+        self.group = group
+        self.set_stats()
 
     @classmethod
     def load_sound(cls, sound, volume, ratio):
         """метод для загрузки звука врага"""
         if cls.sound is None:
-            cls.sound = pygame.mixer.Sound(sound)
+            cls.sound = assets.sound(sound)
             cls.sound.set_volume(min(volume * ratio, 1))
             cls.load_base_sounds(ratio)
 
@@ -39,12 +56,10 @@ class Enemy(AnimatedGameObject):
     def load_base_sounds(cls, ratio):
         """метод для загрузки звуков, общих для всех врагов"""
         if cls.damage_sound is None:
-            cls.damage_sound = pygame.mixer.Sound(
-                "assets/sounds/enemy_damage.wav")
+            cls.damage_sound = assets.sound("assets/sounds/enemy_damage.wav")
             cls.damage_sound.set_volume(0.2 * ratio)
         if cls.death_sound is None:
-            cls.death_sound = pygame.mixer.Sound(
-                "assets/sounds/enemy_death.wav")
+            cls.death_sound = assets.sound("assets/sounds/enemy_death.wav")
             cls.death_sound.set_volume(0.3 * ratio)
 
     def move_h(self):
@@ -52,97 +67,98 @@ class Enemy(AnimatedGameObject):
         if self.x > self.screen_width or self.x < -self.rect.width:
             self.horizontal_speed *= -1
 
-    def update(self, scroll: int):
+    def update(self):
         """метод для обновления спрайта"""
         super().update()
         self.move_h()
-        self.scroll(scroll)
         self.play_sound(self.sound_reload)
-        if self.y > self.screen_height or self.hp <= 0:
+        if self.screen_y > self.screen_height or self.hp <= 0:
             self.delete()
-        if self.horizontal_speed < 0 != self.facing_right:
-            self.rotate_image()
-
-    def scroll(self, offset: int):
-        """метод для сдвига платформы вниз по экрану"""
-        self.rect.y += offset
+        # спрайты врагов смотрят вправо, при движении влево кадр отражается
+        self.set_mirrored(self.facing_right and self.horizontal_speed < 0)
 
     def take_damage(self, damage: int):
         """метод для нанесения урона"""
         self.hp -= damage
-        self.damage_sound.play()
+        voices.play(self.damage_sound, "hit")
 
     def play_sound(self, step: float):
         """метод для воспроизведения звука предмета"""
         if self.sound_timer <= 0:
-            self.sound.play()
+            voices.play(self.sound, "enemy")
             self.sound_timer = self.sound_length
         else:
             self.sound_timer -= step
 
     def delete(self, spawn_coin=False):
         if self.hp <= 0 or spawn_coin:
-            coin = HoloCoin(*self.rect.center,
-                            (self.screen_width, self.screen_width),
-                            price=self.reward, ratio=self.volume_ratio)
+            coin = pools.acquire(HoloCoin, *self.rect.center,
+                                 (self.screen_width, self.screen_width),
+                                 price=self.reward, ratio=self.volume_ratio)
             self.group.add(coin)
-            self.death_sound.play()
+            voices.play(self.death_sound, "hit")
         super().delete()
 
-    def rotate_image(self):
-        self.image = pygame.transform.flip(self.image, True, False)
-
 
 class FlyingEye(Enemy):
     def __init__(self, x, y, screen_size, group, ratio):
-        images = [f"assets/enemies/eye/{image}" for image in os.listdir(
-            "assets/enemies/eye")]
+        images = assets.frames("assets/enemies/eye")
         super().__init__(x, y, images, screen_size, group,
                          "assets/sounds/monster_sound.wav",
                          volume=0.4, ratio=ratio)
-        self.hp = 200
         self.reward = 200
         self.facing_right = False
         self.sound_reload = 0.025
 
+    def set_stats(self):
+        super().set_stats()
+        self.hp = 200
+
 
 class Dragon(Enemy):
     """Класс для создания дракона"""
 
     def __init__(self, x, y, screen_size, group, ratio):
-        images = [f"assets/enemies/dragon/{image}" for image in os.listdir(
-            "assets/enemies/dragon") for _ in range(4)]
+        images = assets.frames("assets/enemies/dragon")
         super().__init__(x, y, images, screen_size, group,
-                         "assets/sounds/dragon.wav", volume=0.2, ratio=ratio)
-        self.horizontal_speed = 6
+                         "assets/sounds/dragon.wav", volume=0.2, ratio=ratio,
+                         frame_repeat=4)
         self.reward = 300
+
+    def set_stats(self):
+        self.horizontal_speed = 6
         self.hp = 300
 
 
 class Medusa(Enemy):
     """Класс для создания медузы"""
+    blood_colors = ((103, 197, 10), (255, 217, 0), (124, 215, 194),
+                    (5, 78, 111), (20, 20, 20))
 
     def __init__(self, x, y, screen_size, group, ratio):
-        images = [f"assets/enemies/medusa/{image}" for image in os.listdir(
-            "assets/enemies/medusa") for _ in range(4)]
+        images = assets.frames("assets/enemies/medusa")
         super().__init__(x, y, images, screen_size, group,
-                         "assets/sounds/medusa.wav", volume=0.2, ratio=ratio)
+                         "assets/sounds/medusa.wav", volume=0.2, ratio=ratio,
+                         frame_repeat=4)
+
+    def set_stats(self):
+        super().set_stats()
         self.horizontal_speed = 3
-        self.blood_colors = ((103, 197, 10), (255, 217, 0), (124, 215, 194),
-                             (5, 78, 111), (20, 20, 20))
 
 
 class Gin(Enemy):
     """Класс для создания медузы"""
+    blood_colors = ((27, 2, 63), (0, 106, 249), (0, 192, 249),
+                    (220, 0, 254), (188, 0, 254), (83, 25, 251))
 
     def __init__(self, x, y, screen_size, group, ratio):
-        images = [f"assets/enemies/gin/{image}" for image in os.listdir(
-            "assets/enemies/gin") for _ in range(5)]
+        images = assets.frames("assets/enemies/gin")
         super().__init__(x, y, images, screen_size, group,
-                         "assets/sounds/gin.wav", volume=0.2, ratio=ratio)
+                         "assets/sounds/gin.wav", volume=0.2, ratio=ratio,
+                         frame_repeat=5)
         self.sound_reload = 0.03
-        self.horizontal_speed = 5
         self.reward = 150
+
+    def set_stats(self):
+        self.horizontal_speed = 5
         self.hp = 150
-        self.blood_colors = ((27, 2, 63), (0, 106, 249), (0, 192, 249),
-                             (220, 0, 254), (188, 0, 254), (83, 25, 251))
@@ -0,0 +1,139 @@
+import argparse
+from audio import voices
+import os
+from profiler import profiler
+from pool import pools
+import pygame
+from replay import InputRecorder, InputReplay
+from resources import assets
+
+
+class HeadlessManager():
+    """Мэнэджер сцен для запуска уровня без окна"""
+
+    def __init__(self):
+        self.loaded_scenes = []
+
+    def load_scene(self, index, clear_groups=True):
+        """метод для запоминания сцен, которые запросил уровень"""
+        self.loaded_scenes.append(index)
+
+    def idle(self, scene):
+        """без окна сцены не ждут следующего кадра"""
+        pass
+
+    @property
+    def game_over(self) -> bool:
+        return 2 in self.loaded_scenes
+
+
+def init_headless(width=600, height=600) -> pygame.Surface:
+    """функция для инициализации pygame с фиктивными видео и аудио драйверами"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.mixer.pre_init(44100, -16, 2, 512)
+    pygame.init()
+    pygame.font.init()
+    voices.set_num_channels(32)
+    return pygame.display.set_mode((width, height))
+
+
+def create_level(display: pygame.Surface, fps=60, seed=None, replay=None,
+                 record=None):
+    """функция для создания уровня, готового к запуску без окна
+        (replay - запись для повтора, record - путь для записи ввода)"""
+    # импорт после инициализации, так как сцены загружают изображения
+    from scenes import Level
+    manager = HeadlessManager()
+    level = Level(display, manager, fps)
+    level.seed = seed
+    # прокачка из записи применяется при подготовке уровня
+    level.input_replay = replay
+    if record is not None:
+        level.input_recorder = InputRecorder(record)
+    level.restart()
+    return level, manager
+
+
+def run_level(frames: int, width=600, height=600, profile=False,
+              render=True, seed=None, replay=None, record=None) -> dict:
+    """функция для запуска уровня без окна на заданное количество кадров
+        (каждый кадр - один шаг симуляции, render=False отключает отрисовку)"""
+    display = init_headless(width, height)
+    level, manager = create_level(display, seed=seed, replay=replay,
+                                  record=record)
+    level.set_headless(True, frames, render)
+    profiler.enable(profile)
+    disk_reads = assets.disk_reads
+    level.show()
+    return {
+        "frames": level.frames_count,
+        "wall_time": level.run_time,
+        "fps": level.get_fps(),
+        "game_over": manager.game_over,
+        "score": level.get_score(),
+        "seed": level.run_seed,
+        # обращения к диску за ресурсами во время игры (после загрузки сцены)
+        "disk_reads": assets.disk_reads - disk_reads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Запуск уровня без окна и ограничения FPS")
+    parser.add_argument("-f", "--frames", type=int, default=None,
+                        help="максимальное количество кадров (по умолчанию "
+                             "3600 или длина повторяемой записи)")
+    parser.add_argument("-p", "--profile", action="store_true",
+                        help="вывести среднее время фаз кадра")
+    parser.add_argument("-n", "--no-render", action="store_true",
+                        help="только симуляция, без отрисовки кадров")
+    parser.add_argument("-a", "--assets", action="store_true",
+                        help="вывести память, занятую ресурсами")
+    parser.add_argument("--pools", action="store_true",
+                        help="вывести статистику пулов объектов")
+    parser.add_argument("--voices", action="store_true",
+                        help="вывести статистику звуковых голосов")
+    parser.add_argument("-s", "--seed", type=int, default=None,
+                        help="зерно генерации забега")
+    parser.add_argument("-r", "--record", metavar="PATH",
+                        help="записать ввод забега в файл")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="повторить записанный забег")
+    args = parser.parse_args()
+    replay = InputReplay.load(args.replay) if args.replay else None
+    frames = args.frames
+    if frames is None:
+        frames = replay.steps if replay is not None else 3600
+    result = run_level(frames, profile=args.profile,
+                       render=not args.no_render, seed=args.seed,
+                       replay=replay, record=args.record)
+    print(f"Frames: {result['frames']}")
+    print(f"Wall time: {result['wall_time']:.3f} s")
+    print(f"FPS: {result['fps']:.1f}")
+    print(f"Game over: {result['game_over']}, score: {result['score']}")
+    print(f"Seed: {result['seed']}")
+    if replay is not None and replay.score is not None:
+        print(f"Replay score matches: {replay.score == result['score']}")
+    if args.profile:
+        for name, (average, maximum) in profiler.get_summary().items():
+            print(f"{name:24} avg {average * 1000:7.3f} ms  "
+                  f"max {maximum * 1000:7.3f} ms")
+    if args.pools:
+        for name, stats in sorted(pools.get_stats().items()):
+            print(f"{name:16} free {stats['free']:4} active "
+                  f"{stats['active']:4} created {stats['created']:5} "
+                  f"reused {stats['reused']:6} dropped {stats['dropped']:4}")
+    if args.voices:
+        stats = voices.get_stats()
+        print(f"Voices played {stats['played']} stolen {stats['stolen']} "
+              f"dropped {stats['dropped']} deduped {stats['deduped']}")
+    if args.assets:
+        print(f"Asset disk reads during run: {result['disk_reads']}")
+        for category, entry in sorted(assets.memory_report().items()):
+            print(f"{category:12} {entry['count']:4} assets "
+                  f"{entry['bytes'] / 1024:10.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,22 @@
+from audio import voices
 from core import AnimatedGameObject
-import os
 import pygame
-import random
+from randomness import rng
+from resources import assets
 
 
 class GameItem(AnimatedGameObject):
     """Абстрактный класс для игрового предмета"""
     sound = None
     is_muted = False
+    # категория звука в VoiceManager
+    SOUND_CATEGORY = "item"
 
     def __init__(self, x, y, images, screen_size, sound, volume, ratio=1,
-                 convert_alpha=True, create_static=True, colorkey=None):
+                 convert_alpha=True, create_static=True, colorkey=None,
+                 frame_repeat=1):
         super().__init__(x, y, images, screen_size, convert_alpha,
-                         create_static, colorkey)
+                         create_static, colorkey, frame_repeat)
         self.volume = volume
         self.volume_ratio = ratio
         self.__class__.load_sound(sound, min(volume * ratio, 1))
@@ -22,10 +26,17 @@ class GameItem(AnimatedGameObject):
         self.collect_with_item = False
         self.draw_order = 0
 
+    def reset(self, x, y, *args, **kwargs):
+        super().reset(x, y)
+        self.activated = False
+        self.sound_timer = 0
+
     @classmethod
     def load_sound(cls, file, volume):
         if cls.sound is None:
-            cls.sound = pygame.mixer.Sound(file)
+            # у каждого класса своя копия звука, чтобы громкость и
+            # заглушение не влияли на другие предметы с тем же файлом
+            cls.sound = assets.sound(file, owner=cls.__name__)
         cls.sound.set_volume(volume)
 
     def activate(self, player: pygame.sprite.Sprite):
@@ -35,19 +46,13 @@ class GameItem(AnimatedGameObject):
     def update(self, *args, **kwargs):
         """метод для обновления спрайта"""
         super().update(kwargs.get("skip_frames", 1))
-        if args:
-            self.scroll(args[0])
-        if self.y > self.screen_height:
+        if self.screen_y > self.screen_height:
             self.delete()
 
-    def scroll(self, offset: int):
-        """метод для сдвига предмета вниз по экрану"""
-        self.rect.y += offset
-
     def play_sound(self, step: float):
         """метод для воспроизведения звука предмета"""
         if self.sound_timer <= 0:
-            self.sound.play()
+            voices.play(self.sound, self.SOUND_CATEGORY)
             self.sound_timer = self.sound_length
         else:
             self.sound_timer -= step
@@ -66,6 +71,7 @@ class GameItem(AnimatedGameObject):
 
 class FlyingGameItem(GameItem):
     """Абстрактный класс для создания летающих игровых объектов"""
+    SOUND_CATEGORY = "powerup"
 
     def __init__(self, x, y, images, screen_size, sound, volume, ratio,
                  convert_alpha=True, lifespan=120, speed=2):
@@ -100,7 +106,7 @@ class Spring(GameItem):
 
     def activate(self, player: pygame.sprite.Sprite):
         if not self.activated:
-            self.sound.play()
+            voices.play(self.sound, self.SOUND_CATEGORY)
             self.activated = True
             player.set_momentum(-10)
             player.spawn_particles()
@@ -116,34 +122,31 @@ class Spring(GameItem):
 
 class PropellerHat(FlyingGameItem):
     """Класс для создания шапки с пропеллером"""
+    colors = ((64, 64, 64), (128, 128, 128), (192, 192, 192))
 
     def __init__(self, x, y, screen_size, ratio, upgrade=None):
         images = ["assets/items/hat32.png"]
-        images += [f"assets/items/hat/{image}" for image in os.listdir(
-            "assets/items/hat")]
+        images += assets.frames("assets/items/hat")
         speed = upgrade[0] if upgrade is not None else 2
         lifespan = upgrade[1] if upgrade is not None else 180
         super().__init__(
             x, y, images, screen_size, "assets/sounds/hat.wav", volume=0.6,
             ratio=ratio, lifespan=lifespan, speed=speed)
-        self.colors = ((64, 64, 64), (128, 128, 128), (192, 192, 192))
 
     def update(self, *args, **kwargs):
         player = kwargs.get("player")
-        if not self.activated:
-            self.scroll(args[0])
-        else:
+        if self.activated:
             super().update(skip_frames=3)
             self.set_pos((player.x + 30 - 23 * player.facing_right,
                           player.y - 25))
             self.spawn_particles(player)
             self.lifespan -= 1
             self.play_sound(0.025)
-        if self.lifespan == 0 or self.y > self.screen_height:
+        if self.lifespan == 0 or self.screen_y > self.screen_height:
             self.delete(player)
 
     def spawn_particles(self, player: pygame.sprite.Sprite):
-        color = random.choice(self.colors)
+        color = rng.effects.choice(self.colors)
         player.spawn_particles(*self.rect.center, color, amount=1)
 
 
@@ -157,7 +160,7 @@ class Trampoline(GameItem):
                          volume=0.25, ratio=ratio)
 
     def activate(self, player: pygame.sprite.Sprite):
-        self.sound.play()
+        voices.play(self.sound, self.SOUND_CATEGORY)
         player.set_momentum(-15)
         player.spawn_particles()
         player.rotate()
@@ -165,11 +168,11 @@ class Trampoline(GameItem):
 
 class Jetpack(FlyingGameItem):
     """Класс для создание джетпака"""
+    colors = ((255, 77, 0), (255, 157, 0), (255, 234, 0))
 
     def __init__(self, x, y, screen_size, ratio, upgrade=None):
         images = ["assets/items/jetpack48.png"]
-        images += [f"assets/items/jetpack/{image}" for image in os.listdir(
-            "assets/items/jetpack")]
+        images += assets.frames("assets/items/jetpack")
         speed = upgrade[0] if upgrade is not None else 3
         lifespan = upgrade[1] if upgrade is not None else 240
         super().__init__(x, y, images, screen_size,
@@ -177,30 +180,23 @@ class Jetpack(FlyingGameItem):
                          ratio=ratio, lifespan=lifespan, speed=speed)
         self.image = self.static_image
         self.facing_right = True
-        self.colors = ((255, 77, 0), (255, 157, 0), (255, 234, 0))
 
     def update(self, *args, **kwargs):
         player = kwargs.get("player")
-        if not self.activated:
-            self.scroll(args[0])
-        else:
+        if self.activated:
             super().update()
-            self.flip_image(player.facing_right)
+            self.set_mirrored(self.facing_right != player.facing_right)
             self.set_pos(
                 (player.x + player.rect.w - 15 - player.rect.w * player.facing_right,
                  player.y + 5))
             self.spawn_particles(player)
             self.play_sound(0.01)
             self.lifespan -= 1
-        if self.lifespan == 0 or self.y > self.screen_height:
+        if self.lifespan == 0 or self.screen_y > self.screen_height:
             self.delete(player)
 
-    def flip_image(self, player_facing_right):
-        if self.facing_right != player_facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
-
     def spawn_particles(self, player: pygame.sprite.Sprite):
-        color = random.choice(self.colors)
+        color = rng.effects.choice(self.colors)
         direction = -1 if player.facing_right else 1
         x = player.x + player.rect.w - (player.rect.w + 5) * player.facing_right + 8
         y = player.y + 50
@@ -213,10 +209,10 @@ class Coin(GameItem):
 
     def __init__(self, x, y, folder, screen_size, price, ratio,
                  ignore_scroll=False):
-        images = [f"{folder}/{image}" for image in os.listdir(folder)
-                  for _ in range(3)]
+        images = assets.frames(folder)
         super().__init__(x, y, images, screen_size, "assets/sounds/coin.wav",
-                         volume=0.3, ratio=ratio, create_static=False)
+                         volume=0.3, ratio=ratio, create_static=False,
+                         frame_repeat=3)
         self.price = price
         self.ignore_scroll = ignore_scroll
         self.is_magnetized = False
@@ -225,23 +221,37 @@ class Coin(GameItem):
         self.speed_coefficient = 13
         self.collect_with_item = True
 
+    def reset(self, x, y, screen_size, ratio, ignore_scroll=False):
+        super().reset(x, y)
+        self.volume_ratio = ratio
+        self.sound.set_volume(min(self.volume * ratio, 1))
+        self.ignore_scroll = ignore_scroll
+        self.is_magnetized = False
+        self.speed_x = 0
+        self.speed_y = 0
+        self.speed_coefficient = 13
+
     def activate(self, player: pygame.sprite.Sprite):
         if not self.activated:
-            self.sound.play()
+            voices.play(self.sound, self.SOUND_CATEGORY)
             self.activated = True
             player.add_money(self.price)
             self.spawn_particles(player)
             self.delete()
 
     def update(self, *args, **kwargs):
-        if not self.ignore_scroll:
-            super().update(*args, **kwargs)
-            if self.is_magnetized:
-                self.rect.x -= self.speed_x
-                self.rect.y -= self.speed_y
-                self.is_magnetized = False
-        else:
-            super().update()
+        super().update(*args, **kwargs)
+        if self.is_magnetized:
+            self.rect.x -= self.speed_x
+            self.rect.y -= self.speed_y
+            self.is_magnetized = False
+
+    @property
+    def screen_y(self) -> int:
+        """монетки с ignore_scroll хранят экранные, а не мировые координаты"""
+        if self.ignore_scroll:
+            return self.rect.y
+        return self.rect.y - self.camera.y
 
     def spawn_particles(self, player: pygame.sprite.Sprite):
         player.spawn_explosion(*self.rect.center, self.colors, radius=(1, 10))
@@ -256,50 +266,55 @@ class Coin(GameItem):
 
 class BronzeCoin(Coin):
     """Класс для создания бронзовых монеток"""
+    colors = ((205, 127, 50), (110, 58, 7), (195, 131, 79))
 
     def __init__(self, x, y, screen_size, ratio, ignore_scroll=False):
         super().__init__(x, y, "assets/items/bronze_coin", screen_size,
                          price=1, ratio=ratio, ignore_scroll=ignore_scroll)
-        self.colors = ((205, 127, 50), (110, 58, 7), (195, 131, 79))
 
 
 class SilverCoin(Coin):
     """Класс для создания серебрянных монеток"""
+    colors = ((208, 210, 209), (168, 169, 173), (117, 117, 117))
 
     def __init__(self, x, y, screen_size, ratio, ignore_scroll=False):
         super().__init__(x, y, "assets/items/silver_coin", screen_size,
                          price=5, ratio=ratio, ignore_scroll=ignore_scroll)
-        self.colors = ((208, 210, 209), (168, 169, 173), (117, 117, 117))
 
 
 class GoldenCoin(Coin):
     """Класс для создания золотых монеток"""
+    colors = ((255, 215, 0), (229, 146, 2), (255, 247, 122))
 
     def __init__(self, x, y, screen_size, ratio, ignore_scroll=False):
         super().__init__(x, y, "assets/items/golden_coin", screen_size,
                          price=10, ratio=ratio, ignore_scroll=ignore_scroll)
-        self.colors = ((255, 215, 0), (229, 146, 2), (255, 247, 122))
 
 
 class HoloCoin(Coin):
     """Класс для создания голографических монеток"""
+    colors = ((107, 210, 255), (172, 180, 252), (253, 207, 191),
+              (253, 107, 182), (228, 98, 248), (139, 124, 241))
 
     def __init__(self, x, y, screen_size, ratio, price=50, ignore_scroll=False):
         super().__init__(x, y, "assets/items/holo_coin", screen_size,
                          price=price, ratio=ratio, ignore_scroll=ignore_scroll)
-        self.colors = ((107, 210, 255), (172, 180, 252), (253, 207, 191),
-                       (253, 107, 182), (228, 98, 248), (139, 124, 241))
+
+    def reset(self, x, y, screen_size, ratio, price=50, ignore_scroll=False):
+        super().reset(x, y, screen_size, ratio, ignore_scroll)
+        self.price = price
 
 
 class Shield(GameItem):
     """Класс для создания щита"""
+    SOUND_CATEGORY = "powerup"
 
     def __init__(self, x, y, screen_size, ratio, upgrade=None):
         images = ["assets/items/shield32.png"]
-        images += [f"assets/items/shield/{image}" for image in os.listdir(
-            "assets/items/shield") for _ in range(3)]
+        images += assets.frames("assets/items/shield")
         super().__init__(x, y, images, screen_size,
-                         "assets/sounds/shield.wav", volume=0.4, ratio=ratio)
+                         "assets/sounds/shield.wav", volume=0.4, ratio=ratio,
+                         frame_repeat=3)
         self.lifespan = upgrade if upgrade is not None else 240
         self.image = self.static_image
         self.collect_with_item = True
@@ -312,14 +327,12 @@ class Shield(GameItem):
 
     def update(self, *args, **kwargs):
         player = kwargs.get("player")
-        if not self.activated:
-            self.scroll(args[0])
-        else:
+        if self.activated:
             super().update()
             self.rect.center = player.item_pos
             self.lifespan -= 1
             self.play_sound(0.04)
-        if self.lifespan == 0 or self.y > self.screen_height:
+        if self.lifespan == 0 or self.screen_y > self.screen_height:
             self.delete(player)
 
     def on_delete(self, player: pygame.sprite.Sprite):
@@ -329,13 +342,14 @@ class Shield(GameItem):
 
 class Magnet(GameItem):
     """Класс для создания магнита"""
+    SOUND_CATEGORY = "powerup"
 
     def __init__(self, x, y, screen_size, ratio, upgrade=None):
         images = ["assets/items/magnet32.png"]
-        images += [f"assets/items/magnet/{image}" for image in os.listdir(
-            "assets/items/magnet") for _ in range(2)]
+        images += assets.frames("assets/items/magnet")
         super().__init__(x, y, images, screen_size,
-                         "assets/sounds/magnet.wav", volume=0.4, ratio=ratio)
+                         "assets/sounds/magnet.wav", volume=0.4, ratio=ratio,
+                         frame_repeat=2)
         self.diameter = upgrade[0] if upgrade is not None else 150
         self.lifespan = upgrade[1] if upgrade is not None else 240
         self.image = self.static_image
@@ -351,15 +365,13 @@ class Magnet(GameItem):
 
     def update(self, *args, **kwargs):
         player = kwargs.get("player")
-        if not self.activated:
-            self.scroll(args[0])
-        else:
+        if self.activated:
             super().update()
             self.rect.center = player.item_pos
             self.coverage_area.center = player.rect.center
             self.play_sound(0.03)
             self.lifespan -= 1
-        if self.lifespan == 0 or self.y > self.screen_height:
+        if self.lifespan == 0 or self.screen_y > self.screen_height:
             self.delete(player)
 
     def on_delete(self, player: pygame.sprite.Sprite):
@@ -369,15 +381,17 @@ class Magnet(GameItem):
 
 class Hole(GameItem):
     """Класс для создпния дыры"""
+    colors = ((254, 0, 246), (69, 0, 169), (46, 0, 108), (30, 0, 70))
 
     def __init__(self, x, y, screen_size, ratio):
-        images = [f"assets/items/hole/{image}" for image in os.listdir(
-            "assets/items/hole") for _ in range(3)]
+        # первый кадр отделяется от повторенных путей как статичный,
+        # его оставшиеся повторы остаются в цикле анимации
+        images = [path for path in assets.frames("assets/items/hole")
+                  for _ in range(3)]
         super().__init__(x, y, images, screen_size, "assets/sounds/hole.wav",
                          volume=0.5, ratio=ratio)
-        self.colors = ((254, 0, 246), (69, 0, 169), (46, 0, 108), (30, 0, 70))
         self.collect_with_item = True
-        self.sound.play()
+        voices.play(self.sound, self.SOUND_CATEGORY)
         self.draw_order = 3
 
     def activate(self, player: pygame.sprite.Sprite):
@@ -409,16 +423,14 @@ class Rocket(FlyingGameItem):
 
     def update(self, *args, **kwargs):
         player = kwargs.get("player")
-        if not self.activated:
-            self.scroll(args[0])
-        else:
+        if self.activated:
             super().update()
             self.set_pos((player.x - 15, player.top - player.rect.h))
             self.spawn_particles(player)
-            self.flip_image(player.facing_right)
+            self.set_mirrored(self.facing_right != player.facing_right)
             self.play_sound(0.01)
             self.lifespan -= 1
-        if self.lifespan == 0 or self.y > self.screen_height:
+        if self.lifespan == 0 or self.screen_y > self.screen_height:
             self.delete(player)
 
     def spawn_particles(self, player: pygame.sprite.Sprite):
@@ -426,9 +438,5 @@ class Rocket(FlyingGameItem):
         y = self.bottom - 5
         for _ in range(20):
             player.spawn_glowing_particles(x, y, amount=2,
-                                           momentum=random.randrange(2, 6),
-                                           radius=random.randrange(4, 12))
-
-    def flip_image(self, player_facing_right):
-        if self.facing_right != player_facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+                                           momentum=rng.effects.randrange(2, 6),
+                                           radius=rng.effects.randrange(4, 12))
@@ -1,16 +1,45 @@
-import json
+import argparse
+from audio import voices
+from core import SceneRegistry
 import pygame
+from replay import InputRecorder
+from resources import assets
 from scenes import *
+from storage import save_store
+import time
 
 
 class Game():
     """Главный класс игры, ответственный за управление сценами"""
+    # сцены, которые скорее всего понадобятся после текущей
+    # (создаются заранее, пока текущая сцена ждет следующего кадра)
+    NEXT_SCENES = {
+        "main_menu": ("level", "shop", "settings_menu"),
+        "level": ("pause_menu", "game_over_menu"),
+        "game_over_menu": ("shop",),
+        "pause_menu": ("settings_menu",),
+        "shop": ("level",),
+        "settings_menu": ("level",),
+    }
+    # количество кадров сцены до начала подготовки следующих сцен
+    WARM_UP_DELAY = 30
+    # время кадра (в секундах), которое тратится на обработку файлов,
+    # загруженных в фоне
+    PRELOAD_BUDGET = 0.004
 
-    def __init__(self, width: int, height: int, fps=60):
+    def __init__(self, width: int, height: int, fps=60, warm_up=True,
+                 startup_report=False, preload_workers=4, record=None):
+        # время этапов запуска до первого кадра главного меню
+        self.startup_report = startup_report
+        self.startup_start = time.perf_counter()
+        self.startup_mark = self.startup_start
+        self.startup_stages = {}
         pygame.init()
         pygame.font.init()
         pygame.mixer.pre_init(44100, -16, 2, 512)
-        pygame.mixer.set_num_channels(32)
+        # каналы распределяет VoiceManager
+        voices.set_num_channels(32)
+        self.mark_startup("pygame init")
         self.SCREEN_SIZE = (width, height)
         self.display = pygame.display.set_mode(self.SCREEN_SIZE)
         self.FPS = fps
@@ -18,13 +47,26 @@ class Game():
         pygame.display.set_caption("Doodle Jump")
         pygame.display.set_icon(pygame.image.load(
             "assets/character/character0.png").convert_alpha())
+        self.mark_startup("display")
 
-        self.main_menu = MainMenu(self.display, self, self.FPS)
-        self.level = Level(self.display, self, self.FPS)
-        self.game_over_menu = GameOverMenu(self.display, self, self.FPS)
-        self.shop = ShopMenu(self.display, self, self.FPS)
-        self.pause_menu = PauseMenu(self.display, self, self.FPS)
-        self.settings_menu = SettingsMenu(self.display, self, self.FPS)
+        # путь для записи ввода забегов (запись подключается к уровню
+        # при его создании)
+        self.record_path = record
+        # сцены создаются при первом обращении
+        self.scenes = SceneRegistry(self.display, self, self.FPS,
+                                    on_create=self.setup_scene)
+        self.scenes.register("main_menu", MainMenu)
+        self.scenes.register("level", Level)
+        self.scenes.register("game_over_menu", GameOverMenu)
+        self.scenes.register("shop", ShopMenu)
+        self.scenes.register("pause_menu", PauseMenu)
+        self.scenes.register("settings_menu", SettingsMenu)
+        self.scenes.register("loading_screen", LoadingScreen)
+        self.warm_up = warm_up
+        # ресурсы всех сцен загружаются в фоне после первого кадра меню
+        # (0 потоков - без фоновой загрузки)
+        self.preload_workers = preload_workers
+        self.preload_job = None
 
         self.load_main_menu = True
         self.load_level = False
@@ -41,14 +83,7 @@ class Game():
 
     def update_sound_volume(self):
         """метод для получения громкости звука"""
-        try:
-            with open("values.json", "r", encoding="u8") as f:
-                data = json.load(f)
-        except Exception as err:
-            print(err)
-            self.volume_ratio = 1
-        else:
-            self.volume_ratio = data.get(self.MUSIC_KEY, 1)
+        self.volume_ratio = save_store.get(self.MUSIC_KEY, 1)
 
     def apply_sound_volume(self):
         """метод для установки громкости музыки"""
@@ -57,26 +92,107 @@ class Game():
         else:
             pygame.mixer.music.set_volume(0.25 * self.volume_ratio)
 
+    def setup_scene(self, name: str, scene: GameScene):
+        """метод для настройки только что созданной сцены"""
+        if name == "level" and self.record_path is not None:
+            scene.input_recorder = InputRecorder(self.record_path)
+
+    def get_scene(self, name: str) -> GameScene:
+        """метод для получения сцены: если она еще не создана, а фоновая
+            загрузка не завершена, сначала показывается экран загрузки"""
+        if self.scenes.get_loaded(name) is None and \
+                self.preload_job is not None and not self.preload_job.done:
+            loading_screen = self.scenes.get("loading_screen")
+            loading_screen.job = self.preload_job
+            loading_screen.show()
+        return self.scenes.get(name)
+
     def switch_scenes(self):
         """метод для переключения сцен в зависимости от флагов"""
         if self.load_main_menu:
-            self.level.stop_sounds()
-            self.main_menu.show()
+            if (level := self.scenes.get_loaded("level")) is not None:
+                level.stop_sounds()
+            self.get_scene("main_menu").show()
         elif self.load_level:
-            self.level.restart()
-            self.level.show()
+            level = self.get_scene("level")
+            level.restart()
+            level.show()
         elif self.revive_level:
-            self.level.revive_game(self.clear_groups)
+            self.get_scene("level").revive_game(self.clear_groups)
         elif self.load_game_over_menu:
-            self.game_over_menu.set_score(self.level.get_score())
-            self.game_over_menu.update_money(self.level.get_collected_money())
-            self.game_over_menu.show()
+            level = self.get_scene("level")
+            game_over_menu = self.get_scene("game_over_menu")
+            game_over_menu.set_score(level.get_score())
+            game_over_menu.update_money(level.get_collected_money())
+            game_over_menu.show()
         elif self.load_shop:
-            self.shop.show()
+            self.get_scene("shop").show()
         elif self.load_pause_menu:
-            self.pause_menu.show()
+            self.get_scene("pause_menu").show()
         elif self.load_settings:
-            self.settings_menu.show()
+            self.get_scene("settings_menu").show()
+
+    def start_preload(self):
+        """метод для запуска фоновой загрузки ресурсов всех сцен"""
+        manifest = assets.merge_manifests(
+            scene_type.ASSETS
+            for scene_type in self.scenes.scene_types.values())
+        self.preload_job = assets.preload_async(
+            manifest, workers=self.preload_workers)
+        if self.startup_report:
+            print(f"Preloading {self.preload_job.total} files "
+                  f"on {self.preload_workers} threads")
+
+    def process_preload(self) -> bool:
+        """метод для обработки части загруженных в фоне файлов
+            (возвращает True, когда загрузка завершена)"""
+        if self.preload_job is None:
+            if not self.preload_workers:
+                return True
+            self.start_preload()
+        if self.preload_job.done:
+            return True
+        if self.preload_job.process(self.PRELOAD_BUDGET) and \
+                self.startup_report:
+            print(f"Preloaded {self.preload_job.total} files in "
+                  f"{self.preload_job.duration * 1000:.1f} ms")
+        return self.preload_job.done
+
+    def idle(self, scene: GameScene):
+        """метод, вызываемый сценой после каждого кадра: отчет о запуске,
+            фоновая загрузка ресурсов и заблаговременное создание
+            следующих сцен"""
+        name = next((name for name, loaded in self.scenes.scenes.items()
+                     if loaded is scene), None)
+        if self.startup_report and name == "main_menu" and \
+                "main menu first frame" not in self.startup_stages:
+            self.mark_startup("main menu first frame")
+            self.print_startup_report()
+        # следующие сцены создаются только после фоновой загрузки,
+        # иначе их ресурсы читались бы с диска в главном потоке
+        if not self.process_preload():
+            return
+        if self.warm_up and scene.frames_count >= self.WARM_UP_DELAY:
+            created = self.scenes.warm_up(self.NEXT_SCENES.get(name, ()))
+            if created is not None and self.startup_report:
+                print(f"Warmed up {created} in "
+                      f"{self.scenes.timings[created] * 1000:.1f} ms")
+
+    def mark_startup(self, stage: str):
+        """метод для запоминания длительности этапа запуска"""
+        now = time.perf_counter()
+        self.startup_stages[stage] = now - self.startup_mark
+        self.startup_mark = now
+
+    def print_startup_report(self):
+        """метод для вывода времени этапов запуска"""
+        print("Startup report:")
+        for stage, duration in self.startup_stages.items():
+            print(f"  {stage:28} {duration * 1000:8.1f} ms")
+        for name, duration in self.scenes.timings.items():
+            print(f"    create {name:19} {duration * 1000:8.1f} ms")
+        total = self.startup_mark - self.startup_start
+        print(f"Interactive main menu after {total * 1000:.1f} ms")
 
     def play_music(self):
         """метод для воспроизведения фоновой музыки в зависимости от сцены"""
@@ -110,6 +226,8 @@ class Game():
         elif index == 6:
             self.load_settings = True
         self.clear_groups = clear_groups
+        # запись накопленных изменений сохранений при смене сцены
+        save_store.flush()
         self.update_sound_volume()
         self.apply_sound_volume()
 
@@ -126,11 +244,26 @@ class Game():
     def run(self):
         self.update_sound_volume()
         self.apply_sound_volume()
+        self.mark_startup("settings")
         while True:
             self.play_music()
             self.switch_scenes()
 
 
 if __name__ == '__main__':
-    game = Game(width=600, height=600)
+    parser = argparse.ArgumentParser(description="Doodle Jump")
+    parser.add_argument("-r", "--record", metavar="PATH",
+                        help="записывать ввод забегов в файл "
+                             "(для повтора через headless.py --replay)")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="не создавать следующие сцены заранее")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="вывести время этапов запуска")
+    parser.add_argument("--preload-workers", type=int, default=4,
+                        help="потоки фоновой загрузки ресурсов "
+                             "(0 - без фоновой загрузки)")
+    args = parser.parse_args()
+    game = Game(width=600, height=600, warm_up=not args.no_warm_up,
+                startup_report=args.startup_report,
+                preload_workers=args.preload_workers, record=args.record)
     game.run()
@@ -1,17 +1,24 @@
+from audio import voices
 from core import *
 from enemies import Enemy
 from items import GameItem, Coin
-import os
+from particles import ParticleGovernor, ParticleSystem
+from pool import pools
+from profiler import profiler
 import pygame
-import random
+from randomness import rng
+from resources import assets
 
 
 class MainCharacter(AnimatedGameObject):
     """Класс для создания главного персонажа"""
+    PARTICLES_KEY = "particles"
+    shoot_colors = ((187, 210, 102), (127, 163, 1), (70, 91, 0),
+                    (204, 221, 141))
+    rotation_cache = RotationCache(step=12)
 
     def __init__(self, x, y, screen_size, damage=None, reload_time=None, jump=None):
-        images = [f"assets/character/{image}" for image in os.listdir(
-            "assets/character")]
+        images = assets.frames("assets/character")
         super().__init__(x, y, images, screen_size, create_static=False)
         self.width = self.image.get_width()
         self.height = self.image.get_height()
@@ -30,21 +37,24 @@ class MainCharacter(AnimatedGameObject):
         self.reload_time = reload_time if reload_time is not None else 90
         self.jum_height = jump if jump is not None else -4
         self.reload_timer = 0
-        self.shoot_colors = (
-            (187, 210, 102), (127, 163, 1), (70, 91, 0), (204, 221, 141))
         self.volume_ratio = 1
-        self.jump_sound = pygame.mixer.Sound("assets/sounds/jump.wav")
-        self.shoot_sound = pygame.mixer.Sound("assets/sounds/shoot.wav")
+        self.jump_sound = assets.sound("assets/sounds/jump.wav")
+        self.shoot_sound = assets.sound("assets/sounds/shoot.wav")
         self.update_sound_volume()
         self.jump_sound.set_volume(0.45 * self.volume_ratio)
         self.shoot_sound.set_volume(0.3 * self.volume_ratio)
-        self.bullets = Group()
-        self.particles = Group()
+        # удаленные пули возвращаются в пул
+        self.bullets = Group(cell_size=128, on_remove=pools.release)
+        self.particles = ParticleSystem()
         self.is_rotating = False
         self.current_rotation = 0
+        # повороты кадров для вращения на батуте (шаг совпадает с update_image)
+        self.rotation_cache.build(self.images + self.mirrored_images)
         self.item_pos = self.rect.center
+        self.previous_pos = self.pos
         self.particles_coefficient = 1
-        self.PARTICLES_KEY = "particles"
+        self.particles_governor = ParticleGovernor()
+        self.particles_governor.limit(self.particles)
 
     def move_h(self, offset: int):
         """метод для перемещения персонажа по горизонтали
@@ -59,10 +69,9 @@ class MainCharacter(AnimatedGameObject):
     def flip_image(self, direction: int):
         """метод для попворота персонажа в засимомти от направления движения"""
         if (direction > 0) != self.facing_right:
-            self.images = tuple(map(
-                lambda img: pygame.transform.flip(img, True, False),
-                self.images))
             self.facing_right = not self.facing_right
+            # кадры персонажа смотрят влево, отраженные - вправо
+            self.mirrored = self.facing_right
 
     def process_collision(self, coll: pygame.sprite.Sprite):
         """метод для обработки столкновений"""
@@ -107,21 +116,24 @@ class MainCharacter(AnimatedGameObject):
         """метод для обработки гравитации"""
         if self.falling:
             self.v_momentum += self.gravity_ratio
-            if self.y > self.screen_height - self.height:
+            if self.screen_y > self.screen_height - self.height:
                 self.v_momentum = 0
             self.rect.y += self.v_momentum
         if self.flying_object is not None:
             self.rect.y -= self.flying_object.speed
 
     def shoot(self, target_x: int, target_y: int):
-        """метод для выстрела в определенном направлении"""
+        """метод для выстрела в определенном направлении
+            (цель задается в экранных координатах)"""
         if self.reload_timer == 0:
+            target_y += self.camera.y
             x_pos = self.rect.right if self.facing_right else self.rect.left
-            bullet = Bullet(x_pos - 10, self.y + 15, "assets/items/bullet.png",
-                            (self.screen_width, self.screen_height))
+            bullet = pools.acquire(
+                Bullet, x_pos - 10, self.y + 15, "assets/items/bullet.png",
+                (self.screen_width, self.screen_height))
             bullet.shoot(target_x, target_y)
             self.bullets.add(bullet)
-            self.shoot_sound.play()
+            voices.play(self.shoot_sound, "player")
             self.spawn_explosion(x_pos, self.y + 15, self.shoot_colors)
             self.reload_timer = self.reload_time
 
@@ -136,16 +148,18 @@ class MainCharacter(AnimatedGameObject):
 
     def jump(self):
         """метод для прыжка от платформы"""
-        self.jump_sound.play()
+        voices.play(self.jump_sound, "player")
         self.set_momentum(self.jum_height)
         for _ in range(20):
-            self.spawn_particles(amount=1, radius=random.randrange(4, 10),
-                                 momentum=random.randrange(0, 3))
+            self.spawn_particles(amount=1, radius=rng.effects.randrange(4, 10),
+                                 momentum=rng.effects.randrange(0, 3))
 
     def update(self, enemy_group):
         self.move_v()
-        self.bullets.update()
-        self.particles.update()
+        with profiler.phase("update: bullets"):
+            self.bullets.update()
+        with profiler.phase("update: particles"):
+            self.particles.update()
         for enemy in enemy_group:
             self.calculate_bullets_collisions(enemy)
         if self.reload_timer > 0:
@@ -159,7 +173,7 @@ class MainCharacter(AnimatedGameObject):
             if self.current_rotation > 360:
                 self.is_rotating = False
         self.current_frame = int(self.v_momentum < 0)
-        self.image = self.images[self.current_frame]
+        self.image = self.get_frames()[self.current_frame]
 
     def load_upgrades(self, damage=None, reload_time=None, jump=None):
         """метод для загрузки прокачки игрока при перезагрузке сцены"""
@@ -171,46 +185,65 @@ class MainCharacter(AnimatedGameObject):
                         amount=10, direction=None, momentum=3, lifespan=120):
         x = self.rect.center[0] if x is None else x
         y = self.bottom if y is None else y
-        for _ in range(round(amount * self.particles_coefficient)):
-            if direction is None:
-                direction = random.choice((-1, 0, 1))
-            self.particles.raw_add(Particle(x, y, radius, color,
-                                            direction=direction,
-                                            momentum=momentum,
-                                            lifespan=lifespan))
+        coefficient = self.get_particles_coefficient()
+        if direction is None:
+            direction = rng.effects.choice((-1, 0, 1))
+        self.particles.spawn(x, y, radius, color,
+                             round(amount * coefficient),
+                             direction, momentum, lifespan)
 
     def spawn_explosion(self, x, y, colors, amount=2, radius=(2, 8),
                         repeat=25, momentum=4):
         """метод для спавна взрыва из частиц"""
-        for _ in range(round(repeat * self.particles_coefficient)):
-            res_momentum = random.randrange(-momentum, momentum)
-            res_radius = random.randint(*radius)
-            color = random.choice(colors)
-            self.spawn_particles(x, y, color, amount=amount, radius=res_radius,
-                                 momentum=res_momentum)
+        coefficient = self.get_particles_coefficient()
+        groups = round(repeat * coefficient)
+        generator = self.particles.random
+        palette = self.particles.get_palette(colors)
+        self.particles.spawn_groups(
+            x, y, generator.integers(radius[0], radius[1] + 1, groups),
+            palette[generator.integers(0, len(palette), groups)],
+            generator.integers(-1, 2, groups),
+            generator.integers(-momentum, momentum, groups),
+            round(amount * coefficient))
 
     def spawn_glowing_particles(self, x, y, amount=10, direction=None,
                                 radius=8, momentum=3, lifespan=120):
         """метод для спавна светящихся частиц"""
-        for _ in range(round(amount * self.particles_coefficient)):
-            if direction is None:
-                direction = random.choice((-1, 0, 1))
-            particle = GlowingParticle(x, y, radius, direction=direction,
-                                       momentum=momentum, lifespan=lifespan)
-            self.particles.raw_add(particle)
-
-    def draw(self, win: pygame.Surface):
+        coefficient = self.get_particles_coefficient()
+        if direction is None:
+            direction = rng.effects.choice((-1, 0, 1))
+        self.particles.spawn(x, y, radius,
+                             amount=round(amount * coefficient),
+                             direction=direction, momentum=momentum,
+                             lifespan=lifespan, glowing=True)
+
+    def store_position(self):
+        """метод для запоминания положения перед шагом симуляции
+            (предметы игрока крепятся к положению на конец прошлого шага)"""
+        self.previous_pos = self.pos
+        self.item_pos = self.pos if self.is_rotating else self.rect.center
+
+    def get_draw_pos(self, alpha: float) -> tuple[int, int]:
+        """метод для получения экранной позиции между прошлым и текущим
+            шагом симуляции (по камере, подготовленной для отрисовки)"""
+        (x, y), (previous_x, previous_y) = self.pos, self.previous_pos
+        # переход через край экрана не интерполируется
+        if abs(x - previous_x) <= self.rect.w:
+            x = round(previous_x + (x - previous_x) * alpha)
+        y = round(previous_y + (y - previous_y) * alpha)
+        return x, y - self.camera.view_y
+
+    def draw(self, win: pygame.Surface, alpha=1):
+        x, y = self.get_draw_pos(alpha)
         if not self.is_rotating:
-            win.blit(self.image, self.rect)
-            self.item_pos = self.rect.center
+            win.blit(self.image, (x, y))
         else:
-            image = pygame.transform.rotate(self.image, self.current_rotation)
-            x = self.x - image.get_width() // 2
-            y = self.y - image.get_height() // 2
-            win.blit(image, (x, y))
-            self.item_pos = self.pos
-        self.bullets.draw(win)
-        self.particles.raw_draw(win)
+            image, (offset_x, offset_y) = self.rotation_cache.get(
+                self.image, self.current_rotation)
+            win.blit(image, (x + offset_x, y + offset_y))
+        self.bullets.draw(win, offset=self.camera.view_y)
+        with profiler.phase("particles draw"):
+            self.particles.draw(win, self.camera.view_y)
 
     def rotate(self):
         """метод для запуска вращения игрока вокруг своей оси"""
@@ -254,6 +287,10 @@ class MainCharacter(AnimatedGameObject):
         if (amount := self.get_game_value(self.PARTICLES_KEY)) != -1:
             self.particles_coefficient = amount
 
+    def get_particles_coefficient(self) -> float:
+        """метод для получения коэффициента частиц с учетом времени кадра"""
+        return self.particles_governor.apply(self.particles_coefficient)
+
     def set_shield(self, shield=None):
         if self.shield is not None and shield is not None:
             self.shield.delete(self)
@@ -284,6 +321,9 @@ class MainCharacter(AnimatedGameObject):
         self.item_pos = self.rect.center
         self.bullets.clear()
         self.particles.clear()
+        # замедление прошлого забега не ограничивает частицы в новом
+        self.particles_governor.reset()
+        self.particles_governor.limit(self.particles)
 
 
 class Bullet(StaticGameObject):
@@ -299,13 +339,17 @@ class Bullet(StaticGameObject):
         self.speed_coefficient = 10
         self.lifespan = 150
 
+    def reset(self, x, y, *args, **kwargs):
+        super().reset(x, y)
+        self.speed_x = 0
+        self.speed_y = 0
+        self.speed_coefficient = 10
+        self.lifespan = 150
+
     @classmethod
     def load_image(cls, image_path, convert_alpha):
         if cls.image is None:
-            if convert_alpha:
-                cls.image = pygame.image.load(image_path).convert_alpha()
-            else:
-                cls.image = pygame.image.load(image_path).convert()
+            cls.image = assets.image(image_path, convert_alpha)
 
     def shoot(self, target_x: int, target_y: int):
         """метод для старта полета пули в определенном направлении"""
@@ -316,7 +360,7 @@ class Bullet(StaticGameObject):
         self.rect.x -= self.speed_x
         self.rect.y -= self.speed_y
         self.lifespan -= 1
-        condition1 = self.x > self.screen_width or self.y > self.screen_height
+        condition1 = self.x > self.screen_width or self.screen_y > self.screen_height
         condition2 = self.x < self.rect.width or self.x < self.rect.height
         if condition1 or condition2 or self.lifespan <= 0:
             self.delete()
@@ -0,0 +1,300 @@
+from collections import deque
+import numpy as np
+import pygame
+from randomness import rng
+
+
+class GlowSpriteCache():
+    """Класс для хранения заранее отрисованных спрайтов свечения частиц
+        (спрайты хранятся по округленному радиусу, размер кэша ограничен
+        максимальным радиусом, более крупные спрайты рисуются без кэша)"""
+
+    def __init__(self, max_radius=32, step=1, color=(20, 20, 20)):
+        self.max_radius = max_radius
+        self.step = step
+        self.color = color
+        self.sprites = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0  # спрайты крупнее max_radius
+
+    def quantize(self, radius: float) -> int:
+        """метод для округления радиуса до ключа кэша"""
+        return round(radius / self.step) * self.step
+
+    def create_sprite(self, radius: int) -> pygame.Surface:
+        image = pygame.Surface((radius * 2, radius * 2))
+        pygame.draw.circle(image, self.color, (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        return image
+
+    def build(self):
+        """метод для отрисовки всех спрайтов кэша заранее"""
+        for radius in range(self.step, self.max_radius + 1, self.step):
+            if radius not in self.sprites:
+                self.sprites[radius] = self.create_sprite(radius)
+
+    def get(self, radius: float):
+        """метод для получения спрайта и его радиуса (None для пустых частиц)"""
+        key = self.quantize(radius)
+        if key <= 0:
+            return None, 0
+        if key > self.max_radius:
+            self.uncached += 1
+            return self.create_sprite(key), key
+        if (sprite := self.sprites.get(key)) is None:
+            self.misses += 1
+            sprite = self.create_sprite(key)
+            self.sprites[key] = sprite
+        else:
+            self.hits += 1
+        return sprite, key
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def get_stats(self) -> dict:
+        """метод для получения статистики попаданий в кэш"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self.sprites),
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": self.hits / total if total else 0,
+        }
+
+
+glow_cache = GlowSpriteCache()
+
+
+class ParticleGovernor():
+    """Класс для подстройки количества частиц под измеренное время кадра
+        (множитель уменьшает и количество новых частиц, и жесткий предел
+        живых частиц)"""
+
+    def __init__(self, target_frame_time=1 / 60, window=30, min_scale=0.1,
+                 step_down=0.85, step_up=1.05, base_cap=4000):
+        self.target_frame_time = target_frame_time
+        # предел живых частиц при множителе 1 (около половины кадра
+        # на обновление и отрисовку светящихся частиц)
+        self.base_cap = base_cap
+        self.frame_times = deque(maxlen=window)
+        self.min_scale = min_scale
+        self.step_down = step_down
+        self.step_up = step_up
+        # множитель коэффициента частиц из настроек (0; 1]
+        self.scale = 1
+
+    def register_frame(self, frame_time: float):
+        """метод для учета времени кадра и изменения множителя частиц
+            (решение принимается по среднему за полное окно кадров, чтобы
+            единичные долгие кадры не уменьшали количество частиц)"""
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return
+        average = sum(self.frame_times) / len(self.frame_times)
+        if average > self.target_frame_time:
+            self.scale = max(self.scale * self.step_down, self.min_scale)
+        elif average < self.target_frame_time * 0.75:
+            self.scale = min(self.scale * self.step_up, 1)
+        self.frame_times.clear()
+
+    def apply(self, coefficient: float) -> float:
+        """метод для получения итогового коэффициента частиц"""
+        return coefficient * self.scale
+
+    def get_cap(self) -> int:
+        return int(self.base_cap * self.scale)
+
+    def limit(self, particles):
+        """метод для установки предела частиц системы по множителю
+            (лишние живые частицы удаляются сразу)"""
+        particles.max_particles = self.get_cap()
+        if (overflow := len(particles) - particles.max_particles) > 0:
+            particles.evict(overflow)
+
+    def reset(self):
+        self.frame_times.clear()
+        self.scale = 1
+
+
+class ParticleSystem():
+    """Класс для хранения и обновления частиц в массивах NumPy
+        (каждое свойство частиц хранится в отдельном непрерывном массиве)"""
+
+    # свойства частиц: название массива -> (тип, форма одного элемента)
+    FIELDS = {
+        "x": (np.float64, ()),
+        "y": (np.float64, ()),
+        "speed_x": (np.float64, ()),
+        "momentum": (np.float64, ()),
+        "radius": (np.float64, ()),
+        "lifespan": (np.int32, ()),
+        "color": (np.uint8, (3,)),
+        "glowing": (np.bool_, ()),
+    }
+
+    def __init__(self, capacity=1024, gravity=0.2, max_particles=20000,
+                 eviction="smallest"):
+        self.gravity = gravity
+        # жесткое ограничение количества живых частиц
+        self.max_particles = max_particles
+        # какие частицы удаляются первыми при превышении: smallest/oldest
+        self.eviction = eviction
+        self.evicted = 0
+        self.count = 0
+        self.capacity = 0
+        self.colors_cache = {}
+        self.allocate(capacity)
+
+    @property
+    def random(self) -> np.random.Generator:
+        """генератор эффектов текущего забега"""
+        return rng.effects_array
+
+    def allocate(self, capacity: int):
+        """метод для выделения массивов заданного размера с копированием частиц"""
+        for name, (dtype, shape) in self.FIELDS.items():
+            array = np.empty((capacity, *shape), dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def reserve(self, amount: int):
+        """метод для увеличения массивов при нехватке места"""
+        required = self.count + amount
+        if required > self.capacity:
+            capacity = self.capacity
+            while capacity < required:
+                capacity *= 2
+            self.allocate(capacity)
+
+    def get_color(self, color) -> tuple:
+        """метод для перевода цвета (название или RGB) в кортеж RGB"""
+        if (result := self.colors_cache.get(color)) is None:
+            result = tuple(pygame.Color(color))[:3]
+            self.colors_cache[color] = result
+        return result
+
+    def get_palette(self, colors) -> np.ndarray:
+        """метод для перевода набора цветов в массив RGB"""
+        if (result := self.colors_cache.get(colors)) is None:
+            result = np.array([self.get_color(color) for color in colors],
+                              np.uint8)
+            self.colors_cache[colors] = result
+        return result
+
+    def spawn(self, x, y, radius, color=(20, 20, 20), amount=1, direction=1,
+              momentum=3, lifespan=120, glowing=False):
+        """метод для спавна частиц с одинаковыми параметрами
+            (radius, color, direction и momentum могут быть массивами)"""
+        if amount <= 0:
+            return
+        if amount > self.max_particles:
+            keep = slice(amount - self.max_particles, amount)
+            radius, color, direction, momentum = (
+                value[keep] if isinstance(value, np.ndarray) else value
+                for value in (radius, color, direction, momentum))
+            amount = self.max_particles
+        if (overflow := self.count + amount - self.max_particles) > 0:
+            self.evict(overflow)
+        self.reserve(amount)
+        start, end = self.count, self.count + amount
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.speed_x[start:end] = self.random.random(amount) * 5 * direction
+        self.momentum[start:end] = momentum
+        self.radius[start:end] = radius
+        self.lifespan[start:end] = lifespan
+        if isinstance(color, np.ndarray):
+            self.color[start:end] = color
+        else:
+            self.color[start:end] = self.get_color(color)
+        self.glowing[start:end] = glowing
+        self.count = end
+
+    def spawn_groups(self, x, y, radius, colors, direction, momentum,
+                     group_size, lifespan=120, glowing=False):
+        """метод для спавна нескольких групп частиц за один вызов
+            (параметры групп передаются массивами, в каждой группе
+            group_size частиц)"""
+        if group_size <= 0 or len(radius) == 0:
+            return
+        self.spawn(x, y, np.repeat(radius, group_size),
+                   np.repeat(colors, group_size, axis=0),
+                   len(radius) * group_size,
+                   np.repeat(direction, group_size),
+                   np.repeat(momentum, group_size), lifespan, glowing)
+
+    def update(self):
+        """метод для обновления всех частиц и удаления погибших"""
+        count = self.count
+        if count == 0:
+            return
+        self.radius[:count] -= self.random.random(count)
+        self.x[:count] += self.speed_x[:count]
+        self.momentum[:count] += self.gravity
+        self.y[:count] += self.momentum[:count]
+        self.lifespan[:count] -= 1
+        self.compact((self.lifespan[:count] > 0) & (self.radius[:count] > 0))
+
+    def compact(self, alive: np.ndarray):
+        """метод для удаления частиц по маске с сохранением порядка"""
+        count = self.count
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < count:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[:alive_count] = array[:count][alive]
+            self.count = alive_count
+
+    def evict(self, amount: int):
+        """метод для удаления самых старых или самых маленьких частиц"""
+        count = self.count
+        amount = min(amount, count)
+        if amount <= 0:
+            return
+        if self.eviction == "oldest":
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[:count - amount] = array[amount:count]
+            self.count = count - amount
+        else:
+            alive = np.zeros(count, np.bool_)
+            if amount < count:
+                smallest = np.argpartition(self.radius[:count], amount)
+                alive[smallest[amount:]] = True
+            self.compact(alive)
+        self.evicted += amount
+
+    def draw(self, win: pygame.Surface, offset=0):
+        """метод для отрисовки частиц в порядке их появления
+            (offset - вертикальный сдвиг камеры)"""
+        count = self.count
+        if count == 0:
+            return
+        particles = zip(self.x[:count].tolist(),
+                        (self.y[:count] - offset).tolist(),
+                        self.radius[:count].tolist(),
+                        self.color[:count].tolist(),
+                        self.glowing[:count].tolist())
+        for x, y, radius, color, glowing in particles:
+            if glowing:
+                image, size = glow_cache.get(radius)
+                if image is not None:
+                    win.blit(image, (x - size, y - size),
+                             special_flags=pygame.BLEND_RGB_ADD)
+            else:
+                pygame.draw.circle(win, color, (x, y), radius)
+
+    def clear(self):
+        """метод для удаления всех частиц"""
+        self.count = 0
+
+    def __len__(self):
+        return self.count
@@ -1,6 +1,8 @@
+from audio import voices
 from core import StaticGameObject
 import pygame
-import random
+from randomness import rng
+from resources import assets
 
 
 class Platform(StaticGameObject):
@@ -13,29 +15,25 @@ class Platform(StaticGameObject):
             x, y, image_path, screen_size, convert_alpha, load_image=False)
         self.item = None
 
+    def reset(self, x, y, *args, **kwargs):
+        super().reset(x, y)
+        self.item = None
+
     @classmethod
     def load_image(cls, image_path, convert_alpha):
         if cls.image is None:
-            if convert_alpha:
-                cls.image = pygame.image.load(image_path).convert_alpha()
-            else:
-                cls.image = pygame.image.load(image_path).convert()
+            cls.image = assets.image(image_path, convert_alpha)
 
     def activate(self, player: pygame.sprite.Sprite):
         """метод для обработки коллизии с игроком"""
         player.rect.bottom = self.top
         player.jump()
 
-    def update(self, scroll: int):
+    def update(self):
         """метод для обновления спрайта"""
-        self.scroll(scroll)
-        if self.y > self.screen_height:
+        if self.screen_y > self.screen_height:
             self.delete()
 
-    def scroll(self, offset: int):
-        """метод для сдвига платформы вниз по экрану"""
-        self.rect.y += offset
-
     def add_item(self, item: pygame.sprite.Sprite):
         """метод для добавления предмета к платформе"""
         if isinstance(item, pygame.sprite.Sprite) and self.item is None:
@@ -60,32 +58,41 @@ class MovingPlatform(Platform):
             x, y, "assets/platforms/moving_platform.png", screen_size)
         self.horizontal_speed = 2
 
-    def update(self, scroll: int):
+    def reset(self, x, y, *args, **kwargs):
+        super().reset(x, y)
+        self.horizontal_speed = 2
+
+    def update(self):
         self.rect.x += self.horizontal_speed
         if self.x > self.screen_width or self.x < -self.rect.width:
             self.horizontal_speed *= -1
-        super().update(scroll)
+        super().update()
 
 
 class BreakingPlatform(Platform):
     """Класс для создания разрушающихся платформ"""
+    colors = ((210, 165, 109), (206, 139, 84), (189, 126, 74),
+              (150, 97, 61), (131, 80, 46))
     sound = None
 
     def __init__(self, x, y, screen_size, ratio):
         super().__init__(
             x, y, "assets/platforms/breaking_platform.png", screen_size)
-        self.colors = ((210, 165, 109), (206, 139, 84), (189, 126, 74),
-                       (150, 97, 61), (131, 80, 46))
         self.volume_ratio = ratio
         if self.__class__.sound is None:
-            self.__class__.sound = pygame.mixer.Sound(
+            self.__class__.sound = assets.sound(
                 "assets/sounds/platform_break.wav")
         self.__class__.sound.set_volume(min(0.55 * self.volume_ratio, 1))
 
+    def reset(self, x, y, screen_size, ratio):
+        super().reset(x, y)
+        self.volume_ratio = ratio
+        self.sound.set_volume(min(0.55 * self.volume_ratio, 1))
+
     def activate(self, player: pygame.sprite.Sprite):
         self.delete()
-        self.sound.play()
+        voices.play(self.sound, "item")
         for _ in range(20):
-            color = random.choice(self.colors)
-            player.spawn_particles(amount=2, momentum=random.randrange(0, 3),
-                                   radius=random.randrange(4, 10), color=color)
+            color = rng.effects.choice(self.colors)
+            player.spawn_particles(amount=2, momentum=rng.effects.randrange(0, 3),
+                                   radius=rng.effects.randrange(4, 10), color=color)
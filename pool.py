@@ -0,0 +1,91 @@
+class ObjectPool():
+    """Класс для повторного использования объектов одного класса
+        (освобожденный объект возвращается в пул и при следующем запросе
+        сбрасывается методом reset с аргументами конструктора)"""
+
+    def __init__(self, cls, max_size=256):
+        self.cls = cls
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0  # объекты, не поместившиеся в заполненный пул
+
+    def acquire(self, *args, **kwargs):
+        """метод для получения объекта (из пула или нового)"""
+        if self.free:
+            obj = self.free.pop()
+            obj.in_pool = False
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        return obj
+
+    def release(self, obj):
+        """метод для возврата объекта в пул (повторный возврат игнорируется)"""
+        if obj.in_pool:
+            return
+        self.released += 1
+        if len(self.free) < self.max_size:
+            obj.in_pool = True
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    @property
+    def active(self) -> int:
+        """количество выданных и еще не возвращенных объектов"""
+        return self.created + self.reused - self.released
+
+    def get_stats(self) -> dict:
+        return {
+            "free": len(self.free),
+            "active": self.active,
+            "created": self.created,
+            "reused": self.reused,
+            "dropped": self.dropped,
+        }
+
+    def clear(self):
+        self.free.clear()
+
+
+class PoolManager():
+    """Класс для хранения пулов по классам объектов
+        (пул создается при первом запросе объекта класса, объекты классов
+        без пула при освобождении просто отбрасываются)"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.pools = {}
+
+    def get_pool(self, cls) -> ObjectPool:
+        if (pool := self.pools.get(cls)) is None:
+            pool = ObjectPool(cls, self.max_size)
+            self.pools[cls] = pool
+        return pool
+
+    def acquire(self, cls, *args, **kwargs):
+        """метод для получения объекта класса с аргументами конструктора"""
+        return self.get_pool(cls).acquire(*args, **kwargs)
+
+    def release(self, obj):
+        """метод для возврата объекта в пул его класса
+            (используется как обработчик удаления спрайтов из группы)"""
+        if (pool := self.pools.get(type(obj))) is not None:
+            pool.release(obj)
+
+    def get_stats(self) -> dict:
+        """метод для получения статистики пулов по именам классов"""
+        return {cls.__name__: pool.get_stats()
+                for cls, pool in self.pools.items()}
+
+    def clear(self):
+        for pool in self.pools.values():
+            pool.clear()
+
+
+pools = PoolManager()
@@ -0,0 +1,128 @@
+from collections import deque
+import pygame
+import time
+
+
+class ProfilerPhase():
+    """Класс для замера времени одной фазы кадра (используется через with)"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class DisabledPhase():
+    """Заглушка фазы для выключенного профайлера"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class FrameProfiler():
+    """Класс для покадрового замера времени фаз игрового цикла"""
+
+    def __init__(self, size=300):
+        self.enabled = False
+        self.overlay = False
+        # кольцевой буфер с замерами последних кадров
+        self.frames = deque(maxlen=size)
+        self.current_frame = {}
+        self.frame_start = 0
+        self.disabled_phase = DisabledPhase()
+        self.font = None
+        self.overlay_color = (0, 0, 0)
+
+    def enable(self, state=True):
+        """метод для включения/выключения замеров"""
+        self.enabled = state
+        if not state:
+            self.overlay = False
+
+    def toggle_overlay(self):
+        """метод для переключения отображения замеров на экране"""
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enabled = True
+
+    def start_frame(self):
+        """метод для начала замера кадра"""
+        if self.enabled:
+            self.current_frame = {}
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """метод для сохранения замеров кадра в буфер"""
+        if self.enabled and self.frame_start:
+            self.current_frame["frame"] = time.perf_counter() - self.frame_start
+            self.frames.append(self.current_frame)
+            self.frame_start = 0
+
+    def phase(self, name: str):
+        """метод для замера фазы: with profiler.phase("name"): ..."""
+        if self.enabled:
+            return ProfilerPhase(self, name)
+        return self.disabled_phase
+
+    def add(self, name: str, duration: float):
+        """метод для добавления длительности фазы к текущему кадру"""
+        self.current_frame[name] = self.current_frame.get(name, 0) + duration
+
+    def clear(self):
+        """метод для очистки буфера замеров"""
+        self.frames.clear()
+        self.current_frame = {}
+
+    def get_frames(self) -> list:
+        """метод для получения замеров последних кадров (в секундах)"""
+        return list(self.frames)
+
+    def get_last_frame(self) -> dict:
+        return self.frames[-1] if self.frames else {}
+
+    def get_phases(self) -> list:
+        """метод для получения названий фаз в порядке их появления"""
+        phases = {}
+        for frame in self.frames:
+            for name in frame:
+                phases[name] = None
+        return list(phases)
+
+    def get_average(self, name: str) -> float:
+        """метод для получения среднего времени фазы по кадрам, где она была"""
+        values = [frame[name] for frame in self.frames if name in frame]
+        return sum(values) / len(values) if values else 0
+
+    def get_max(self, name: str) -> float:
+        return max((frame[name] for frame in self.frames if name in frame),
+                   default=0)
+
+    def get_summary(self) -> dict:
+        """метод для получения среднего и максимального времени всех фаз"""
+        return {name: (self.get_average(name), self.get_max(name))
+                for name in self.get_phases()}
+
+    def draw(self, win: pygame.Surface):
+        """метод для отрисовки замеров поверх сцены"""
+        if self.font is None:
+            self.font = pygame.font.SysFont("consolas", 14)
+        y = 45
+        for name, (average, maximum) in self.get_summary().items():
+            text = self.font.render(
+                f"{name}: {average * 1000:.2f} / {maximum * 1000:.2f} ms",
+                True, self.overlay_color)
+            win.blit(text, (10, y))
+            y += text.get_height()
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,30 @@
+import numpy as np
+import random
+
+
+class RandomStreams():
+    """Класс для хранения генераторов случайных чисел одного забега
+        (генерация мира и эффекты берут числа из разных потоков, поэтому
+        количество частиц не влияет на раскладку уровня)"""
+
+    def __init__(self, seed=None):
+        self.seed = None
+        self.world = None  # платформы, предметы, монетки, враги
+        self.effects = None  # частицы и другие косметические эффекты
+        self.effects_array = None  # то же для массивов частиц NumPy
+        self.seed_run(seed)
+
+    def seed_run(self, seed=None) -> int:
+        """метод для пересоздания генераторов перед забегом
+            (без seed выбирается случайное зерно, которое возвращается)"""
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = seed
+        self.world = random.Random(f"{seed}:world")
+        self.effects = random.Random(f"{seed}:effects")
+        self.effects_array = np.random.default_rng(
+            self.effects.getrandbits(64))
+        return seed
+
+
+rng = RandomStreams()
@@ -0,0 +1,106 @@
+import json
+
+# биты маски зажатых клавиш
+KEY_LEFT = 1
+KEY_RIGHT = 2
+
+
+def encode_keys(move_left: bool, move_right: bool) -> int:
+    return KEY_LEFT * move_left | KEY_RIGHT * move_right
+
+
+class InputRecorder():
+    """Класс для записи ввода игрока по шагам симуляции
+        (хранятся только изменения зажатых клавиш A/D и выстрелы,
+        а также зерно забега и уровни прокачки)"""
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recording = False
+        self.seed = None
+        self.upgrades = {}
+        self.steps = 0
+        self.keys = []  # [шаг, маска клавиш] при каждом изменении
+        self.shots = []  # [шаг, x, y] в экранных координатах
+        self.last_keys = 0
+
+    def start(self, seed: int, upgrades: dict):
+        """метод для начала записи нового забега"""
+        self.recording = True
+        self.seed = seed
+        self.upgrades = dict(upgrades)
+        self.steps = 0
+        self.keys.clear()
+        self.shots.clear()
+        self.last_keys = 0
+
+    def stop(self):
+        self.recording = False
+
+    def record(self, move_left: bool, move_right: bool, shots):
+        """метод для записи ввода одного шага симуляции"""
+        if not self.recording:
+            return
+        if (mask := encode_keys(move_left, move_right)) != self.last_keys:
+            self.keys.append([self.steps, mask])
+            self.last_keys = mask
+        for x, y in shots:
+            self.shots.append([self.steps, x, y])
+        self.steps += 1
+
+    def to_dict(self, score=None) -> dict:
+        return {
+            "version": self.VERSION,
+            "seed": self.seed,
+            "upgrades": self.upgrades,
+            "steps": self.steps,
+            "keys": self.keys,
+            "shots": self.shots,
+            "score": score,
+        }
+
+    def save(self, score=None):
+        """метод для сохранения записи в файл (score - счет в конце
+            записи для проверки повтора)"""
+        try:
+            with open(self.path, "w", encoding="u8") as f:
+                json.dump(self.to_dict(score), f, separators=(",", ":"))
+        except Exception as err:
+            print(err)
+
+
+class InputReplay():
+    """Класс для воспроизведения записанного ввода по шагам симуляции"""
+
+    def __init__(self, data: dict):
+        if data.get("version") != InputRecorder.VERSION:
+            raise ValueError(
+                f"Unsupported replay version: {data.get('version')}")
+        self.seed = data["seed"]
+        self.upgrades = data["upgrades"]
+        self.steps = data["steps"]
+        self.score = data.get("score")
+        self.keys = {step: mask for step, mask in data["keys"]}
+        self.shots = {}
+        for step, x, y in data["shots"]:
+            self.shots.setdefault(step, []).append((x, y))
+        self.step = 0
+        self.mask = 0
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="u8") as f:
+            return cls(json.load(f))
+
+    @property
+    def finished(self) -> bool:
+        return self.step >= self.steps
+
+    def next_step(self) -> tuple[bool, bool, list]:
+        """метод для получения ввода следующего шага
+            (зажата ли A, зажата ли D, выстрелы)"""
+        self.mask = self.keys.get(self.step, self.mask)
+        shots = self.shots.get(self.step, [])
+        self.step += 1
+        return bool(self.mask & KEY_LEFT), bool(self.mask & KEY_RIGHT), shots
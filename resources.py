@@ -0,0 +1,331 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import pygame
+import re
+import time
+
+# атласы собираются скриптом build_atlas.py
+ATLAS_FOLDER = "assets/atlas"
+ATLAS_INDEX = f"{ATLAS_FOLDER}/index.json"
+
+
+def natural_key(name: str) -> list:
+    """функция для сортировки имен файлов с учетом чисел (frame2 < frame10)"""
+    return [int(part) if part.isdigit() else part.lower()
+            for part in re.split(r"(\d+)", name)]
+
+
+class AssetManager():
+    """Класс для загрузки и хранения общих изображений, звуков и списков
+        файлов (каждый файл читается с диска один раз)"""
+
+    def __init__(self, atlas_index=ATLAS_INDEX):
+        self.atlas_index = atlas_index
+        self.regions = None  # путь -> (страница, x, y, ширина, высота)
+        self.atlas_pages = {}  # номер страницы -> Surface
+        self.page_names = []
+        self.images = {}  # (путь, convert_alpha) -> Surface
+        self.sounds = {}  # путь -> Sound
+        self.owned_sounds = {}  # (путь, владелец) -> копия Sound
+        self.listings = {}  # папка -> отсортированные имена файлов
+        self.disk_reads = 0
+
+    def load_atlas(self):
+        """метод для чтения индекса атласов (без индекса изображения
+            загружаются из отдельных файлов)"""
+        self.regions = {}
+        if not os.path.exists(self.atlas_index):
+            return
+        try:
+            with open(self.atlas_index, "r", encoding="u8") as f:
+                data = json.load(f)
+        except Exception as err:
+            print(err)
+        else:
+            self.page_names = data["pages"]
+            self.regions = {path: tuple(region)
+                            for path, region in data["regions"].items()}
+
+    def get_page_path(self, page: int) -> str:
+        folder = os.path.dirname(self.atlas_index)
+        return f"{folder}/{self.page_names[page]}"
+
+    @staticmethod
+    def convert_image(image: pygame.Surface, convert_alpha=True):
+        """метод для перевода изображения в формат экрана
+            (только в главном потоке, без окна изображение не меняется)"""
+        if pygame.display.get_surface() is None:
+            return image
+        if convert_alpha:
+            return image.convert_alpha()
+        return image.convert()
+
+    def get_atlas_page(self, page: int) -> pygame.Surface:
+        """метод для загрузки страницы атласа"""
+        if (surface := self.atlas_pages.get(page)) is None:
+            surface = self.convert_image(
+                pygame.image.load(self.get_page_path(page)))
+            self.disk_reads += 1
+            self.atlas_pages[page] = surface
+        return surface
+
+    def image(self, path: str, convert_alpha=True) -> pygame.Surface:
+        """метод для получения общего изображения по пути
+            (спрайты из атласа возвращаются как его подповерхности)"""
+        key = (path, convert_alpha)
+        if (image := self.images.get(key)) is not None:
+            return image
+        if self.regions is None:
+            self.load_atlas()
+        if convert_alpha and (region := self.regions.get(path)) is not None:
+            page, x, y, width, height = region
+            image = self.get_atlas_page(page).subsurface(
+                (x, y, width, height))
+        else:
+            image = self.convert_image(pygame.image.load(path), convert_alpha)
+            self.disk_reads += 1
+        self.images[key] = image
+        return image
+
+    def load_images(self, paths, convert_alpha=True) -> list:
+        """метод для получения списка изображений (повторы путей
+            возвращают один и тот же объект)"""
+        return [self.image(path, convert_alpha) for path in paths]
+
+    def sound(self, path: str, owner=None) -> pygame.mixer.Sound:
+        """метод для получения звука по пути (owner получает отдельную
+            копию с собственной громкостью, данные звука не декодируются
+            повторно)"""
+        if (sound := self.sounds.get(path)) is None:
+            sound = pygame.mixer.Sound(path)
+            self.disk_reads += 1
+            self.sounds[path] = sound
+        if owner is None:
+            return sound
+        key = (path, owner)
+        if (owned := self.owned_sounds.get(key)) is None:
+            owned = pygame.mixer.Sound(buffer=sound.get_raw())
+            self.owned_sounds[key] = owned
+        return owned
+
+    def listdir(self, folder: str) -> list:
+        """метод для получения отсортированного списка файлов папки
+            (папки, упакованные в атлас, берутся из его индекса)"""
+        if (names := self.listings.get(folder)) is None:
+            if self.regions is None:
+                self.load_atlas()
+            prefix = f"{folder}/"
+            names = [path[len(prefix):] for path in self.regions
+                     if path.startswith(prefix) and
+                     "/" not in path[len(prefix):]]
+            if not names:
+                names = os.listdir(folder)
+                self.disk_reads += 1
+            names = sorted(names, key=natural_key)
+            self.listings[folder] = names
+        return names
+
+    def frames(self, folder: str) -> list:
+        """метод для получения путей кадров анимации из папки"""
+        return [f"{folder}/{name}" for name in self.listdir(folder)]
+
+    def preload(self, manifest: dict):
+        """метод для загрузки ресурсов из манифеста заранее
+            (ключи: images, alpha_images, folders, sounds)"""
+        for path in manifest.get("images", ()):
+            self.image(path, convert_alpha=False)
+        for path in manifest.get("alpha_images", ()):
+            self.image(path)
+        for folder in manifest.get("folders", ()):
+            self.load_images(self.frames(folder))
+        for path in manifest.get("sounds", ()):
+            self.sound(path)
+
+    def get_preload_tasks(self, manifest: dict) -> list:
+        """метод для получения файлов манифеста, которых еще нет в кэше
+            (тип, ключ кэша, путь): изображения из атласа заменяются
+            страницами атласа"""
+        if self.regions is None:
+            self.load_atlas()
+        tasks = {}
+        alpha_paths = list(manifest.get("alpha_images", ()))
+        for folder in manifest.get("folders", ()):
+            alpha_paths += self.frames(folder)
+        for path in manifest.get("images", ()):
+            if (path, False) not in self.images:
+                tasks[(path, False)] = ("image", (path, False), path)
+        for path in alpha_paths:
+            if (path, True) in self.images:
+                continue
+            if (region := self.regions.get(path)) is not None:
+                page = region[0]
+                if page not in self.atlas_pages:
+                    tasks[page] = ("atlas", page, self.get_page_path(page))
+            else:
+                tasks[(path, True)] = ("image", (path, True), path)
+        for path in manifest.get("sounds", ()):
+            if path not in self.sounds:
+                tasks[path] = ("sound", path, path)
+        return list(tasks.values())
+
+    @staticmethod
+    def decode(kind: str, path: str):
+        """метод для чтения и декодирования файла (вызывается в потоках,
+            загрузка файлов в pygame отпускает GIL)"""
+        if kind == "sound":
+            return pygame.mixer.Sound(path)
+        return pygame.image.load(path)
+
+    def store_decoded(self, kind: str, key, data):
+        """метод для сохранения декодированного файла в кэш
+            (в главном потоке, так как convert требует экран)"""
+        self.disk_reads += 1
+        if kind == "sound":
+            self.sounds.setdefault(key, data)
+        elif kind == "atlas":
+            if key not in self.atlas_pages:
+                self.atlas_pages[key] = self.convert_image(data)
+        elif key not in self.images:
+            self.images[key] = self.convert_image(data, key[1])
+
+    def preload_async(self, manifest: dict, workers=4):
+        """метод для запуска фоновой загрузки ресурсов манифеста"""
+        return PreloadJob(self, manifest, workers)
+
+    @staticmethod
+    def merge_manifests(manifests) -> dict:
+        """метод для объединения манифестов нескольких сцен"""
+        result = {}
+        for manifest in manifests:
+            for key, paths in manifest.items():
+                values = result.setdefault(key, [])
+                values += [path for path in paths if path not in values]
+        return result
+
+    @staticmethod
+    def get_category(path: str) -> str:
+        """метод для получения категории ресурса (папка внутри assets)"""
+        parts = path.replace("\\", "/").split("/")
+        if len(parts) > 2 and parts[0] == "assets":
+            return parts[1]
+        return "other"
+
+    def memory_report(self) -> dict:
+        """метод для подсчета памяти, занятой ресурсами, по категориям
+            (категория -> количество и размер в байтах)"""
+        report = {}
+
+        def add(category, size):
+            entry = report.setdefault(category, {"count": 0, "bytes": 0})
+            entry["count"] += 1
+            entry["bytes"] += size
+
+        for (path, _), image in self.images.items():
+            # подповерхности атласа не занимают отдельной памяти
+            if image.get_parent() is None:
+                add(self.get_category(path),
+                    image.get_pitch() * image.get_height())
+        for image in self.atlas_pages.values():
+            add("atlas", image.get_pitch() * image.get_height())
+        sounds = list(self.sounds.items())
+        sounds += [(path, sound)
+                   for (path, _), sound in self.owned_sounds.items()]
+        if sounds:
+            # звуки хранятся в формате микшера: частота, размер сэмпла, каналы
+            frequency, size, channels = pygame.mixer.get_init()
+            sample_size = abs(size) // 8 * channels
+            for path, sound in sounds:
+                add(self.get_category(path),
+                    int(sound.get_length() * frequency) * sample_size)
+        return report
+
+    def clear(self):
+        self.regions = None
+        self.atlas_pages.clear()
+        self.images.clear()
+        self.sounds.clear()
+        self.owned_sounds.clear()
+        self.listings.clear()
+
+
+class PreloadJob():
+    """Класс для фоновой загрузки ресурсов манифеста
+        (файлы читаются и декодируются в потоках, а перевод в формат
+        экрана и запись в кэш выполняются в главном потоке в process)"""
+
+    def __init__(self, manager: AssetManager, manifest: dict, workers=4):
+        self.manager = manager
+        self.manifest = manifest
+        tasks = manager.get_preload_tasks(manifest)
+        self.total = len(tasks)
+        self.completed = 0
+        self.errors = []
+        self.finished = False
+        self.executor = None
+        self.pending = []
+        self.start_time = time.perf_counter()
+        self.duration = 0  # время от запуска до завершения загрузки
+        if tasks:
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="assets")
+            self.pending = [(kind, key, self.executor.submit(
+                manager.decode, kind, path)) for kind, key, path in tasks]
+
+    @property
+    def progress(self) -> float:
+        """доля обработанных файлов [0; 1]"""
+        if not self.total:
+            return 1
+        return self.completed / self.total
+
+    @property
+    def done(self) -> bool:
+        return self.finished
+
+    def process(self, budget=None) -> bool:
+        """метод для обработки декодированных файлов в главном потоке
+            (не дольше budget секунд, если он задан), возвращает done"""
+        if self.finished:
+            return True
+        start = time.perf_counter()
+        still_pending = []
+        for index, (kind, key, future) in enumerate(self.pending):
+            if budget is not None and time.perf_counter() - start > budget:
+                still_pending += self.pending[index:]
+                break
+            if not future.done():
+                still_pending.append((kind, key, future))
+                continue
+            try:
+                self.manager.store_decoded(kind, key, future.result())
+            except Exception as err:
+                print(err)
+                self.errors.append(key)
+            self.completed += 1
+        self.pending = still_pending
+        if not self.pending:
+            self.finish()
+        return self.finished
+
+    def wait(self):
+        """метод для ожидания загрузки всех файлов"""
+        for _, _, future in self.pending:
+            future.exception()
+        self.process()
+
+    def finish(self):
+        """метод для завершения загрузки: оставшиеся ресурсы манифеста
+            берутся из кэша (части атласа создаются без обращения к диску)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        try:
+            self.manager.preload(self.manifest)
+        except Exception as err:
+            print(err)
+        self.duration = time.perf_counter() - self.start_time
+        self.finished = True
+
+
+assets = AssetManager()
@@ -1,53 +1,125 @@
-from core import GameScene, Group, StaticGameObject
+from audio import voices
+from chunks import ChunkPlanner
+from core import GameScene, Group, StaticGameObject, camera
 from enemies import *
 from items import *
 import json
 from main_character import MainCharacter
+from particles import glow_cache
 from platforms import *
+from pool import pools
+from profiler import profiler
 import pygame
-import random
+from randomness import rng
+from resources import assets
+from text import DigitRenderer, text_cache
 
 
 class Level(GameScene):
     """Класс для создания уровня"""
+    # все, что может появиться при генерации чанков, загружается заранее,
+    # чтобы спавн объектов не обращался к диску
+    ASSETS = {
+        "images": ("assets/ui/cycled_bg.jpg",),
+        "alpha_images": (
+            "assets/platforms/static_platform.png",
+            "assets/platforms/moving_platform.png",
+            "assets/platforms/breaking_platform.png",
+            "assets/items/spring16_opened.png", "assets/items/spring16.png",
+            "assets/items/trampoline64.png", "assets/items/hat32.png",
+            "assets/items/jetpack48.png", "assets/items/shield32.png",
+            "assets/items/magnet32.png", "assets/items/bullet.png",
+            "assets/items/rocket/static_rocket.png",
+            "assets/items/rocket/rocket.png"),
+        "folders": (
+            "assets/character", "assets/items/bronze_coin",
+            "assets/items/silver_coin", "assets/items/golden_coin",
+            "assets/items/holo_coin", "assets/items/hat",
+            "assets/items/jetpack", "assets/items/shield",
+            "assets/items/magnet", "assets/items/hole", "assets/enemies/eye",
+            "assets/enemies/dragon", "assets/enemies/medusa",
+            "assets/enemies/gin"),
+        "sounds": (
+            "assets/sounds/lose.wav", "assets/sounds/jump.wav",
+            "assets/sounds/shoot.wav", "assets/sounds/coin.wav",
+            "assets/sounds/spring.wav", "assets/sounds/trampoline.wav",
+            "assets/sounds/hat.wav", "assets/sounds/jetpack.wav",
+            "assets/sounds/shield.wav", "assets/sounds/magnet.wav",
+            "assets/sounds/hole.wav", "assets/sounds/platform_break.wav",
+            "assets/sounds/monster_sound.wav", "assets/sounds/dragon.wav",
+            "assets/sounds/medusa.wav", "assets/sounds/gin.wav",
+            "assets/sounds/enemy_damage.wav",
+            "assets/sounds/enemy_death.wav"),
+    }
+    # сдвиг предметов относительно левого верхнего угла платформы
+    ITEM_OFFSETS = {
+        Spring: (10, -10), PropellerHat: (10, -30), Trampoline: (0, -15),
+        Jetpack: (13, -45), Magnet: (10, -25), Shield: (10, -25),
+        Rocket: (10, -35), Hole: (0, 0), BronzeCoin: (10, -25),
+        SilverCoin: (10, -25), GoldenCoin: (10, -25),
+    }
 
     def __init__(self, display: pygame.Surface, manager, fps=60):
         super(Level, self).__init__(display, manager, fps)
+        # зерно забега (None - новое случайное зерно при каждом перезапуске)
+        self.seed = None
+        self.run_seed = None
+        # запись ввода и повтор записанного забега (см. replay.py)
+        self.input_recorder = None
+        self.input_replay = None
+        # выстрелы применяются в начале следующего шага симуляции
+        self.pending_shots = []
         self.load_upgrades()
 
-        self.background = pygame.image.load(
-            "assets/ui/cycled_bg.jpg").convert()
+        self.background = assets.image(
+            "assets/ui/cycled_bg.jpg", convert_alpha=False)
         self.bg_height = self.background.get_height()
+        glow_cache.build()
         self.main_character = MainCharacter(
             200, 100, self.size, self.damage_upgrade,
             self.reload_upgrade, self.jump_upgrade)
+        self.main_character.particles_governor.target_frame_time = 1 / self.FPS
         # прямоугольник для проверки упал игрок вниз или нет
         self.bottom_rect = pygame.Rect(
             -100, self.size[0] - 2, self.size[1] + 200, 2)
         # координаты фона (нужны, чтобы сдвигать фон при движении вверх)
         self.bg_pos = -self.background.get_height() + self.size[1]
+        self.previous_bg_pos = self.bg_pos
         self.offset = 5
+        # камера уровня: объекты хранят мировые координаты,
+        # а сдвиг экрана применяется только при отрисовке и удалении
+        self.camera = camera
         # переменные для обработки движения по нажатым кнопкам
         self.scroll_down = False
         self.move_right = False
         self.move_left = False
         self.parallax_coefficient = 0.1
         # группы объектов на экране
-        self.platforms = Group()
-        self.items = Group()
-        self.enemies = Group()
+        # размер ячейки для поиска столкновений только среди ближайших спрайтов
+        self.collision_cell_size = 128
+        # платформы, монетки и враги, удаленные из групп, возвращаются
+        # в пулы и переиспользуются при спавне
+        self.platforms = Group(cell_size=self.collision_cell_size,
+                               on_remove=pools.release)
+        self.items = Group(cell_size=self.collision_cell_size,
+                           on_remove=pools.release)
+        self.enemies = Group(cell_size=self.collision_cell_size,
+                             on_remove=pools.release)
 
         self.score_font = pygame.font.SysFont("cambriacambriamath", 30)
+        # счет и деньги собираются из глифов цифр, а не рендерятся каждый кадр
+        self.score_digits = DigitRenderer(self.score_font, (0, 0, 0))
         self.score = 0
         self.enemy_height = 0
         self.coin = GoldenCoin(500, 15, self.size, 1, ignore_scroll=True)
 
-        self.lose_sound = pygame.mixer.Sound("assets/sounds/lose.wav")
+        self.lose_sound = assets.sound("assets/sounds/lose.wav")
         self.lose_sound.set_volume(0.4 * self.volume_ratio)
 
         self.min_width = 125
         self.min_height = 50
         self.chunck_height = self.size[1]
+        self.chunk_planner = ChunkPlanner(self)
         # вероятности спавна монеток (0; 1)
         self.bronze_coin_spawn = 1
         self.silver_coin_spawn = 0
@@ -60,85 +132,108 @@ class Level(GameScene):
         self.dragon_spawn = 0
 
     def spawn_chuck(self, start_y=0):
-        """метод для спавна игрового чанка"""
-        totalh = random.randrange(-50, 100)
-        while totalh < self.size[1]:
-            totalw = random.randrange(-50, 100)
-            height = random.randrange(self.min_height, self.min_height * 2)
-            while totalw < self.size[0]:
-                width = random.randrange(self.min_width, self.min_width * 2)
-                y_offset = random.randrange(-self.min_height, self.min_height)
-                self.spawn_platform(totalw, totalh + start_y + y_offset)
-                totalw += width
-            totalh += height
-        self.min_width += 1
-        self.min_height += 1
+        """метод для спавна игрового чанка (start_y - мировая координата)"""
+        self.spawn_layout(self.chunk_planner.take(), start_y)
 
     def generate_chuncks(self):
-        """метод для генерации чанков в процессе прохождения вверх"""
+        """метод для генерации чанков в процессе прохождения вверх
+            (раскладка следующего чанка готовится по строке за шаг)"""
         self.chunck_height += self.offset
         if self.chunck_height >= self.size[1]:
-            self.spawn_chuck(-self.size[1])
+            self.spawn_chuck(self.camera.y - self.size[1])
             self.chunck_height = 0
+        else:
+            self.chunk_planner.step()
         self.spawn_enemies()
 
-    def spawn_platform(self, x: int, y: int):
-        """метод для генерации платформы"""
-        if random.choice((True, True, True, False)) and 0 <= x < self.size[0] - 65:
-            value = random.random()
-            platform = StaticPlatform(x, y, self.size)
+    def plan_platform(self, x: int, y: int, layout: list):
+        """метод для выбора типа платформы и предмета на ней"""
+        if rng.world.choice((True, True, True, False)) and 0 <= x < self.size[0] - 65:
+            value = rng.world.random()
+            platform_type = StaticPlatform
             if value < 0.15:
-                platform = BreakingPlatform(x, y, self.size, self.volume_ratio)
+                platform_type = BreakingPlatform
             elif value < 0.3:
-                platform = MovingPlatform(x, y, self.size)
-            self.platforms.add(platform)
-            if value > 0.65 and isinstance(platform, StaticPlatform):
-                self.spawn_objects(platform, x, y)
-
-    def spawn_objects(self, platform: Platform, x: int, y: int):
-        """метод для спавна игровых объектов в сцене"""
-        if random.choice((True, False)):
-            item = self.spawn_item(x, y)
+                platform_type = MovingPlatform
+            item_type = None
+            if value > 0.65 and platform_type is StaticPlatform:
+                item_type = self.choose_object()
+            layout.append((platform_type, x, y, item_type))
+
+    def spawn_layout(self, layout: list, start_y: int):
+        """метод для создания спрайтов чанка по готовой раскладке"""
+        for platform_type, x, y, item_type in layout:
+            platform = self.spawn_platform(platform_type, x, y + start_y)
+            if item_type is not None:
+                item = self.create_item(item_type, x, y + start_y)
+                platform.add_item(item)
+                self.items.add(item)
+
+    def spawn_platform(self, platform_type, x: int, y: int) -> Platform:
+        """метод для создания платформы"""
+        if platform_type is BreakingPlatform:
+            platform = pools.acquire(
+                BreakingPlatform, x, y, self.size, self.volume_ratio)
         else:
-            item = self.spawn_coin(x, y)
-        platform.add_item(item)
-        self.items.add(item)
-
-    def spawn_item(self, x, y):
-        """метод для спавна предмета"""
-        value = random.random()
-        item = Spring(x + 10, y - 10, self.size, self.volume_ratio)
+            platform = pools.acquire(platform_type, x, y, self.size)
+        self.platforms.add(platform)
+        return platform
+
+    def choose_object(self):
+        """метод для выбора типа игрового объекта на платформе"""
+        if rng.world.choice((True, False)):
+            return self.choose_item()
+        return self.choose_coin()
+
+    def choose_item(self):
+        """метод для выбора типа предмета"""
+        value = rng.world.random()
         if 0.2 < value < 0.3:
-            item = PropellerHat(
-                x + 10, y - 30, self.size, self.volume_ratio, self.hat_upgrade)
+            return PropellerHat
         elif 0.3 < value < 0.4:
-            item = Trampoline(x, y - 15, self.size, self.volume_ratio)
+            return Trampoline
         elif 0.4 < value < 0.5:
-            item = Jetpack(x + 13, y - 45, self.size, self.volume_ratio,
-                           self.jetpack_upgrade)
+            return Jetpack
         elif 0.5 < value < 0.6:
-            item = Magnet(x + 10, y - 25, self.size, self.volume_ratio,
-                          self.magnet_upgrade)
+            return Magnet
         elif 0.6 < value < 0.7 and self.score > 5000:
-            item = Shield(x + 10, y - 25, self.size, self.volume_ratio,
-                          self.shield_upgrade)
+            return Shield
         elif 0.7 < value < 0.8 and self.score > 10000:
-            item = Rocket(x + 10, y - 35, self.size, self.volume_ratio,
-                          self.rocket_upgrade)
+            return Rocket
         elif 0.8 < value < 0.9 and self.score > 5000:
-            item = Hole(x, y, self.size, self.volume_ratio)
-        if item.is_muted:
-            item.unmute()
-        return item
+            return Hole
+        return Spring
 
-    def spawn_coin(self, x, y):
-        """метод для спавна монеток"""
-        value = random.random()
-        item = BronzeCoin(x + 10, y - 25, self.size, self.volume_ratio)
+    def choose_coin(self):
+        """метод для выбора типа монетки"""
+        value = rng.world.random()
         if self.silver_coin_spawn < value <= self.golden_coin_spawn:
-            item = GoldenCoin(x + 10, y - 25, self.size, self.volume_ratio)
+            return GoldenCoin
         elif self.bronze_coin_spawn < value < self.silver_coin_spawn:
-            item = SilverCoin(x + 10, y - 25, self.size, self.volume_ratio)
+            return SilverCoin
+        return BronzeCoin
+
+    def create_item(self, item_type, x: int, y: int):
+        """метод для создания предмета или монетки над платформой"""
+        offset_x, offset_y = self.ITEM_OFFSETS[item_type]
+        upgrades = {
+            PropellerHat: self.hat_upgrade,
+            Jetpack: self.jetpack_upgrade,
+            Magnet: self.magnet_upgrade,
+            Shield: self.shield_upgrade,
+            Rocket: self.rocket_upgrade,
+        }
+        if item_type in upgrades:
+            item = item_type(x + offset_x, y + offset_y, self.size,
+                             self.volume_ratio, upgrades[item_type])
+        elif issubclass(item_type, Coin):
+            item = pools.acquire(item_type, x + offset_x, y + offset_y,
+                                 self.size, self.volume_ratio)
+        else:
+            item = item_type(
+                x + offset_x, y + offset_y, self.size, self.volume_ratio)
+        if item.is_muted:
+            item.unmute()
         return item
 
     def update_coin_spawn(self):
@@ -157,21 +252,20 @@ class Level(GameScene):
 
     def spawn_enemies(self):
         """метод для спавна врагов"""
-        diff = random.randrange(1500, 2500)
+        diff = rng.world.randrange(1500, 2500)
         if self.score > 7000 and self.score - self.enemy_height > diff:
-            value = random.random()
-            x_pos = random.randrange(0, self.size[0])
-            enemy = Medusa(
-                x_pos, -50, self.size, self.items, self.volume_ratio)
+            value = rng.world.random()
+            x_pos = rng.world.randrange(0, self.size[0])
+            y_pos = self.camera.y - 50
+            enemy_type = Medusa
             if self.eye_spawn < value <= self.dragon_spawn:
-                enemy = Dragon(
-                    x_pos, -50, self.size, self.items, self.volume_ratio)
+                enemy_type = Dragon
             elif self.gin_spawn < value <= self.eye_spawn:
-                enemy = FlyingEye(
-                    x_pos, -50, self.size, self.items, self.volume_ratio)
+                enemy_type = FlyingEye
             elif self.medusa_spawn < value <= self.gin_spawn:
-                enemy = Gin(
-                    x_pos, -50, self.size, self.items, self.volume_ratio)
+                enemy_type = Gin
+            enemy = pools.acquire(enemy_type, x_pos, y_pos, self.size,
+                                  self.items, self.volume_ratio)
             self.enemy_height = self.score
             self.enemies.add(enemy)
 
@@ -193,6 +287,7 @@ class Level(GameScene):
     def check_collisions(self):
         """метод для обработки всех столкновений"""
         ignore = (self.main_character.shield, self.main_character.magnet)
+        self.bottom_rect.y = self.camera.y + self.size[0] - 2
         for group in (self.platforms, self.items, self.enemies):
             for coll in group.get_collisions(self.main_character, ignore):
                 self.scroll_down = self.main_character.process_collision(coll)
@@ -202,27 +297,36 @@ class Level(GameScene):
 
     def redraw(self, win):
         """метод для отрисовки сцены"""
-        win.fill((255, 255, 255))
-        relative_background_y = self.bg_pos % self.bg_height
-        win.blit(self.background, (0, relative_background_y - self.bg_height))
-        if relative_background_y < self.size[1]:
-            win.blit(self.background, (0, relative_background_y))
-        self.platforms.draw(win)
-        self.main_character.draw(win)
-        self.items.draw(win, sort=lambda sprite: sprite.draw_order)
-        self.enemies.draw(win)
-        win.blit(self.render_score(), (10, 10))
-        money = self.render_money()
-        money_x = self.size[0] - money.get_width() - 10
-        win.blit(money, (money_x, 10))
+        # кадр рисуется между двумя последними шагами симуляции
+        offset = self.camera.interpolate(self.alpha)
+        bg_pos = self.previous_bg_pos + (
+            self.bg_pos - self.previous_bg_pos) * self.alpha
+        with profiler.phase("background blit"):
+            win.fill((255, 255, 255))
+            relative_background_y = bg_pos % self.bg_height
+            win.blit(self.background,
+                     (0, relative_background_y - self.bg_height))
+            if relative_background_y < self.size[1]:
+                win.blit(self.background, (0, relative_background_y))
+        with profiler.phase("sprites draw"):
+            self.platforms.draw(win, offset=offset)
+            self.main_character.draw(win, self.alpha)
+            self.items.draw(win, sort=lambda sprite: sprite.draw_order,
+                            offset=offset)
+            self.enemies.draw(win, offset=offset)
+        self.score_digits.draw(win, str(self.score), (10, 10))
+        money = str(self.main_character.get_collected_money())
+        money_x = self.size[0] - self.score_digits.get_width(money) - 10
+        self.score_digits.draw(win, money, (money_x, 10))
         self.coin.set_pos((money_x - self.coin.rect.w - 10, 15))
+        win.blit(self.coin.image, self.coin.rect)
 
     def handle_events(self):
         """метод для обработки событий сцены"""
-        self.generate_chuncks()
-        # остановка сдвига вниз, когда игрок начинает падать вниз
-        if self.main_character.v_momentum > 0:
-            self.scroll_down = False
+        self.main_character.particles_governor.register_frame(
+            self.last_frame_time)
+        self.main_character.particles_governor.limit(
+            self.main_character.particles)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -233,26 +337,59 @@ class Level(GameScene):
             if event.type == pygame.KEYUP:
                 self.handle_keyboard_events(event, state=False)
             if event.type == pygame.MOUSEBUTTONDOWN:
-                self.main_character.shoot(*event.pos)
-
-        self.check_collisions()
+                self.pending_shots.append(event.pos)
+
+    def update(self):
+        """метод для одного шага симуляции уровня"""
+        self.store_state()
+        self.apply_input()
+        with profiler.phase("chunk generation"):
+            self.generate_chuncks()
+        # остановка сдвига вниз, когда игрок начинает падать вниз
+        if self.main_character.v_momentum > 0:
+            self.scroll_down = False
+        with profiler.phase("collisions"):
+            self.check_collisions()
         self.handle_movement()
-        self.main_character.update(self.enemies)
-        self.enemies.update(self.offset if self.scroll_down else 0)
-        self.items.update(self.offset if self.scroll_down else 0,
-                          player=self.main_character)
-        self.platforms.update(self.offset if self.scroll_down else 0)
+        with profiler.phase("update: main character"):
+            self.main_character.update(self.enemies)
+        with profiler.phase("update: enemies"):
+            self.enemies.update()
+        with profiler.phase("update: items"):
+            self.items.update(player=self.main_character)
+            self.coin.update()
+        with profiler.phase("update: platforms"):
+            self.platforms.update()
         self.update_coin_spawn()
         self.update_enemies_spawn()
 
+    def apply_input(self):
+        """метод для применения ввода к шагу симуляции
+            (ввод записывается или заменяется записанным при повторе)"""
+        shots, self.pending_shots = self.pending_shots, []
+        if self.input_replay is not None:
+            self.move_left, self.move_right, shots = \
+                self.input_replay.next_step()
+        elif self.input_recorder is not None:
+            self.input_recorder.record(self.move_left, self.move_right, shots)
+        for x, y in shots:
+            self.main_character.shoot(x, y)
+
+    def store_state(self):
+        """метод для запоминания положений перед шагом симуляции
+            (для интерполяции при отрисовке)"""
+        self.camera.store()
+        self.main_character.store_position()
+        self.previous_bg_pos = self.bg_pos
+
     def handle_movement(self):
         """метод для обработки движения персонажа и платформ"""
         self.offset = 5
         # если игрок находится выше середины экрана,
-        # то сдвигаются платформы вниз, а не игрок вверх
-        while self.main_character.y < self.size[1] // 2 - 50:
-            self.offset += 1
-            self.main_character.rect.y += 1
+        # то камера сдвигается вверх, а не игрок
+        if (lift := self.size[1] // 2 - 50 - self.main_character.screen_y) > 0:
+            self.offset += lift
+            self.main_character.rect.y += lift
         self.move_character(8)
         if self.scroll_down:
             self.scroll(self.offset)
@@ -267,12 +404,17 @@ class Level(GameScene):
             self.move_left = state
         if event.key == pygame.K_d:
             self.move_right = state
+        if event.key == pygame.K_F3 and state:
+            profiler.toggle_overlay()
 
     def scroll(self, offset: int):
-        """метод для сдвига фона вниз"""
+        """метод для сдвига камеры вверх и фона вниз
+            (игрок сдвигается вместе с камерой и остается на месте экрана)"""
         if self.scroll_down:
             self.score += offset
             self.bg_pos += offset * self.parallax_coefficient
+            self.camera.move(-offset)
+            self.main_character.rect.y -= offset
 
     def move_character(self, offset: int):
         """метод для сдвига игрока по горизонтали, пока зажаты кнопки A/D"""
@@ -284,6 +426,9 @@ class Level(GameScene):
     def load_upgrades(self):
         """метод для загрузки прокачки игрока"""
         self.load_upgrades_levels()
+        if self.input_replay is not None:
+            # при повторе используется прокачка из записи
+            self.set_levels_from_data(self.input_replay.upgrades)
         with open("upgrades.json", "r", encoding="u8") as f:
             data = json.load(f)
         self.magnet_upgrade = data.get(self.MAGNET_KEY).get(
@@ -305,10 +450,19 @@ class Level(GameScene):
     def game_over(self):
         """метод для завершения уровня"""
         self.manager.load_scene(2)
-        self.lose_sound.play()
+        voices.play(self.lose_sound, "player")
         self.stop_sounds()
         self.close()
 
+    def close(self):
+        """метод для закрытия уровня с сохранением записи ввода"""
+        if self.input_recorder is not None and self.input_recorder.recording:
+            # после паузы или возрождения забег нельзя повторить,
+            # поэтому запись заканчивается при первом закрытии уровня
+            self.input_recorder.save(self.score)
+            self.input_recorder.stop()
+        super().close()
+
     def stop_sounds(self):
         """метод для остановки всех звуков"""
         for item in self.items:
@@ -325,15 +479,6 @@ class Level(GameScene):
         for item in self.items:
             item.unmute()
 
-    def render_score(self):
-        """Метод для рендера игрового счета"""
-        return self.score_font.render(str(self.score), True, (0, 0, 0))
-
-    def render_money(self):
-        """метод для рендера количества собранных монеток"""
-        return self.score_font.render(
-            str(self.main_character.get_collected_money()), True, (0, 0, 0))
-
     def get_score(self) -> int:
         return self.score
 
@@ -342,14 +487,19 @@ class Level(GameScene):
 
     def restart(self):
         """Метод для перезапуска игры"""
+        seed = self.seed
+        if self.input_replay is not None:
+            seed = self.input_replay.seed
+        self.run_seed = rng.seed_run(seed)
+        self.pending_shots.clear()
         self.reset_values()
         self.unmute_sounds()
         self.main_character.reset()
         self.platforms.clear()
         self.items.clear()
         self.enemies.clear()
+        self.camera.reset()
         self.main_character.set_pos((200, 100))
-        self.items.add(self.coin)
 
     def reset_values(self):
         """метод для сброса значений уровня"""
@@ -359,6 +509,7 @@ class Level(GameScene):
         self.min_width = 125
         self.min_height = 50
         self.chunck_height = self.size[1]
+        self.chunk_planner.reset()
         self.scroll_down = False
         self.move_right = False
         self.move_left = False
@@ -382,15 +533,20 @@ class Level(GameScene):
             for item in self.items:
                 if isinstance(item, Hole):
                     item.delete()
-        self.enemies.update(0)
-        self.items.update(0, player=self.main_character)
-        self.main_character.set_pos((250, 150))
+        self.enemies.update()
+        self.items.update(player=self.main_character)
+        self.main_character.set_pos((250, 150 + self.camera.y))
         self.main_character.game_over = False
         self.move_left = False
         self.move_right = False
         self.show(spawn_chuck=False)
 
     def show(self, spawn_chuck=True):
+        self.prepare(spawn_chuck)
+        super().show()
+
+    def prepare(self, spawn_chuck=True):
+        """метод для подготовки уровня к запуску"""
         self.load_upgrades()
         self.update_sound_volume()
         self.lose_sound.set_volume(0.4 * self.volume_ratio)
@@ -399,25 +555,36 @@ class Level(GameScene):
         self.main_character.update_particles_amount()
         self.main_character.update_sound_volume()
         if spawn_chuck:
-            self.spawn_chuck()
-        super().show()
+            if self.input_recorder is not None:
+                self.input_recorder.start(
+                    self.run_seed, self.get_levels_data())
+            self.spawn_chuck(self.camera.y)
+        self.store_state()
 
 
 class MainMenu(GameScene):
     """Класс для создания главного меню (пока пустой)"""
+    DIRTY_RECTS = True
+    ASSETS = {
+        "images": ("assets/ui/main_menu_bg.jpg",),
+        "alpha_images": ("assets/ui/play_button.png",
+                         "assets/ui/shop_button.png",
+                         "assets/ui/settings_button.png"),
+        "sounds": ("assets/sounds/button_press.wav",),
+    }
 
     def __init__(self, display: pygame.Surface, manager, fps=60):
         super(MainMenu, self).__init__(display, manager, fps)
         self.update_sound_volume()
-        self.background = pygame.image.load(
-            "assets/ui/main_menu_bg.jpg").convert()
+        self.background = assets.image(
+            "assets/ui/main_menu_bg.jpg", convert_alpha=False)
         self.play_button = StaticGameObject(
             400, 125, "assets/ui/play_button.png", self.size)
         self.shop_button = StaticGameObject(
             400, 200, "assets/ui/shop_button.png", self.size)
         self.settings_button = StaticGameObject(
             400, 275, "assets/ui/settings_button.png", self.size)
-        self.click_sound = pygame.mixer.Sound("assets/sounds/button_press.wav")
+        self.click_sound = assets.sound("assets/sounds/button_press.wav")
         self.click_sound.set_volume(0.4 * self.volume_ratio)
 
     def redraw(self, win):
@@ -435,15 +602,15 @@ class MainMenu(GameScene):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.play_button.collidepoint(event.pos):
                     self.manager.load_scene(1)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.close()
                 if self.shop_button.collidepoint(event.pos):
                     self.manager.load_scene(4)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.close()
                 if self.settings_button.collidepoint(event.pos):
                     self.manager.load_scene(6)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.close()
 
     def show(self):
@@ -454,6 +621,15 @@ class MainMenu(GameScene):
 
 class GameOverMenu(GameScene):
     """Класс для создание меню после проигрыша"""
+    DIRTY_RECTS = True
+    ASSETS = {
+        "images": ("assets/ui/game_over_bg.jpg",),
+        "alpha_images": ("assets/ui/restart_button.png",
+                         "assets/ui/menu_button.png",
+                         "assets/ui/continue_button.png",
+                         "assets/ui/revive_dialog.png"),
+        "sounds": ("assets/sounds/click.wav",),
+    }
 
     def __init__(self, display: pygame.Surface, manager, fps=60):
         super(GameOverMenu, self).__init__(display, manager, fps)
@@ -470,12 +646,15 @@ class GameOverMenu(GameScene):
         self.continue_button = StaticGameObject(210, 480,
                                                 "assets/ui/continue_button.png",
                                                 self.size, convert_alpha=True)
-        self.background = pygame.image.load(
-            "assets/ui/game_over_bg.jpg").convert()
-        self.revive_dialog = pygame.image.load(
-            "assets/ui/revive_dialog.png").convert_alpha()
+        self.background = assets.image(
+            "assets/ui/game_over_bg.jpg", convert_alpha=False)
+        self.revive_dialog = assets.image("assets/ui/revive_dialog.png")
+        self.revive_rect = self.revive_dialog.get_rect(topleft=(50, 375))
+        # область с секундами до закрытия диалога возрождения
+        self.countdown_rect = pygame.Rect(
+            370, 480, 60, self.font.get_height())
         self.update_sound_volume()
-        self.click_sound = pygame.mixer.Sound("assets/sounds/click.wav")
+        self.click_sound = assets.sound("assets/sounds/click.wav")
         self.click_sound.set_volume(min(0.6 * self.volume_ratio, 1))
         self.revive_price = 250
         self.revive_countdown = 5 * self.FPS
@@ -485,11 +664,13 @@ class GameOverMenu(GameScene):
 
     def redraw(self, win):
         win.blit(self.background, (50, 50))
-        highscore = self.font.render(
-            f"Highscore: {self.highscore}", True, "black")
-        current_score = self.font.render(f"Score: {self.score}", True, "black")
-        money = self.font.render(f"Money collected: {self.money_collected}",
-                                 True, "black")
+        highscore = text_cache.render(
+            self.font, f"Highscore: {self.highscore}", True, "black")
+        current_score = text_cache.render(
+            self.font, f"Score: {self.score}", True, "black")
+        money = text_cache.render(
+            self.font, f"Money collected: {self.money_collected}", True,
+            "black")
         win.blit(highscore, ((self.size[0] - highscore.get_width()) // 2, 65))
         win.blit(current_score,
                  ((self.size[0] - current_score.get_width()) // 2, 115))
@@ -500,6 +681,8 @@ class GameOverMenu(GameScene):
             self.draw_revive_dialog(win)
 
     def handle_events(self):
+        if self.draw_revive:
+            self.update_revive_countdown()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -508,19 +691,19 @@ class GameOverMenu(GameScene):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.restart_button.collidepoint(event.pos):
                     self.manager.load_scene(1)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.revive_happened = False
                     self.close()
                 if self.menu_button.collidepoint(event.pos):
                     self.manager.load_scene(0)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.revive_happened = False
                     self.close()
                 if self.draw_revive and self.continue_button.collidepoint(event.pos):
                     self.manager.load_scene(3)
                     self.update_money(-self.revive_price)
                     self.revive_happened = True
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.close()
 
     def set_score(self, score: int):
@@ -551,17 +734,25 @@ class GameOverMenu(GameScene):
         """метод для отрисовки диалога возрождения"""
         if self.revive_countdown > 0:
             win.blit(self.revive_dialog, (50, 375))
-            cost_text = self.sub_font.render(
-                f"It costs {self.revive_price}$", True, (0, 0, 0))
-            time_remains = self.font.render(str(
+            cost_text = text_cache.render(
+                self.sub_font, f"It costs {self.revive_price}$", True,
+                (0, 0, 0))
+            time_remains = text_cache.render(self.font, str(
                 self.revive_countdown // self.FPS + 1), True, (0, 0, 0))
             win.blit(cost_text, (
                 (self.revive_dialog.get_width() - cost_text.get_width()) // 2 + 50, 437))
             win.blit(self.continue_button.image, self.continue_button.rect)
             win.blit(time_remains, (370, 480))
-            self.revive_countdown -= 1
-        else:
+
+    def update_revive_countdown(self):
+        """метод для отсчета времени диалога возрождения"""
+        seconds = self.revive_countdown // self.FPS
+        self.revive_countdown -= 1
+        if self.revive_countdown <= 0:
             self.draw_revive = False
+            self.mark_dirty(self.revive_rect)
+        elif self.revive_countdown // self.FPS != seconds:
+            self.mark_dirty(self.countdown_rect)
 
     def restart(self):
         self.revive_countdown = 5 * self.FPS
@@ -579,12 +770,25 @@ class GameOverMenu(GameScene):
 
 class ShopMenu(GameScene):
     """Класс для создания магазина"""
+    DIRTY_RECTS = True
+    ASSETS = {
+        "images": ("assets/ui/shop_bg.jpg",),
+        "alpha_images": ("assets/ui/menu_button.png",
+                         "assets/ui/upgrades_bar.png",
+                         "assets/ui/plus_button.png"),
+        "sounds": ("assets/sounds/button_press.wav",
+                   "assets/sounds/upgrade_unlock.wav"),
+    }
 
     def __init__(self, display: pygame.Surface, manager, fps=60):
         super(ShopMenu, self).__init__(display, manager, fps)
         self.load_upgrades_levels()
         self.update_sound_volume()
         self.font = pygame.font.SysFont("cambriacambriamath", 32)
+        # область надписи с деньгами (выравнивается по правому краю)
+        self.money_rect = pygame.Rect(self.size[0] // 2, 535,
+                                      self.size[0] // 2 - 50,
+                                      self.font.get_height())
         self.menu_button = StaticGameObject(50, 525,
                                             "assets/ui/menu_button.png",
                                             self.size, convert_alpha=True)
@@ -606,10 +810,10 @@ class ShopMenu(GameScene):
             (ShopItem(325, 400, self.size, "Rocket", level=self.rocket_level),
              self.ROCKET_KEY)
         )
-        self.click_sound = pygame.mixer.Sound("assets/sounds/button_press.wav")
-        self.upgrade_sound = pygame.mixer.Sound(
-            "assets/sounds/upgrade_unlock.wav")
-        self.background = pygame.image.load("assets/ui/shop_bg.jpg").convert()
+        self.click_sound = assets.sound("assets/sounds/button_press.wav")
+        self.upgrade_sound = assets.sound("assets/sounds/upgrade_unlock.wav")
+        self.background = assets.image(
+            "assets/ui/shop_bg.jpg", convert_alpha=False)
         self.click_sound.set_volume(0.4 * self.volume_ratio)
         self.upgrade_sound.set_volume(0.3 * self.volume_ratio)
 
@@ -618,8 +822,9 @@ class ShopMenu(GameScene):
         win.blit(self.menu_button.image, self.menu_button.rect)
         for item, _ in self.items:
             item.draw(win)
-        money = self.font.render(f"{self.get_game_value(self.MONEY_KEY)}$",
-                                 True, (0, 0, 0))
+        money = text_cache.render(
+            self.font, f"{self.get_game_value(self.MONEY_KEY)}$", True,
+            (0, 0, 0))
         win.blit(money, (self.size[0] - money.get_width() - 50, 535))
 
     def handle_events(self):
@@ -631,7 +836,7 @@ class ShopMenu(GameScene):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.menu_button.collidepoint(event.pos):
                     self.manager.load_scene(0)
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.close()
                 for item, key in self.items:
                     if item.clicked(event.pos):
@@ -644,7 +849,9 @@ class ShopMenu(GameScene):
                 self.set_game_value(self.MONEY_KEY, money - item.price)
                 item.add_level()
                 self.set_game_value(key, item.level)
-                self.upgrade_sound.play()
+                voices.play(self.upgrade_sound, "ui")
+                self.mark_dirty(self.money_rect)
+                self.mark_dirty(item.get_area())
 
     def show(self):
         self.load_main_menu = False
@@ -712,19 +919,33 @@ class ShopItem(StaticGameObject):
         """метод для проверки нажатия на кнопку"""
         return self.plus_button.collidepoint(position)
 
+    def get_area(self) -> pygame.Rect:
+        """метод для получения области, занимаемой предметом"""
+        return self.rect.unionall((
+            self.title.get_rect(topleft=self.title_pos),
+            self.plus_button.rect))
+
 
 class PauseMenu(GameOverMenu):
     """Класс для создания меню паузы"""
+    DIRTY_RECTS = True
+    ASSETS = {
+        "images": ("assets/ui/pause_bg.png",),
+        "alpha_images": ("assets/ui/continue_button.png",
+                         "assets/ui/menu_button.png"),
+        "sounds": ("assets/sounds/click.wav",),
+    }
 
     def __init__(self, display, manager, fps):
         super(PauseMenu, self).__init__(display, manager, fps)
-        self.background = pygame.image.load("assets/ui/pause_bg.png").convert()
+        self.background = assets.image(
+            "assets/ui/pause_bg.png", convert_alpha=False)
         self.continue_button = StaticGameObject(
             228, 300, "assets/ui/continue_button.png", self.size)
         self.menu_button = StaticGameObject(
             228, 375, "assets/ui/menu_button.png", self.size)
         self.update_sound_volume()
-        self.click_sound = pygame.mixer.Sound("assets/sounds/click.wav")
+        self.click_sound = assets.sound("assets/sounds/click.wav")
         self.click_sound.set_volume(min(0.6 * self.volume_ratio, 1))
 
     def handle_events(self):
@@ -754,11 +975,20 @@ class PauseMenu(GameOverMenu):
 
 class SettingsMenu(GameScene):
     """Класс для создания меню настроек"""
+    DIRTY_RECTS = True
+    ASSETS = {
+        "images": ("assets/ui/shop_bg.jpg",),
+        "alpha_images": ("assets/ui/menu_button.png",
+                         "assets/ui/slider_bg.png",
+                         "assets/ui/slider_fg.png"),
+        "sounds": ("assets/sounds/button_press.wav",),
+    }
 
     def __init__(self, display, manager, fps):
         super().__init__(display, manager, fps)
         self.update_sound_volume()
-        self.background = pygame.image.load("assets/ui/shop_bg.jpg").convert()
+        self.background = assets.image(
+            "assets/ui/shop_bg.jpg", convert_alpha=False)
         self.menu_button = StaticGameObject(
             50, 525, "assets/ui/menu_button.png", self.size)
         self.sliders = (
@@ -775,7 +1005,7 @@ class SettingsMenu(GameScene):
         self.PARTICLES_KEY = "particles"
         self.VOLUME_KEY = "volume"
         self.MUSIC_KEY = "music"
-        self.click_sound = pygame.mixer.Sound("assets/sounds/button_press.wav")
+        self.click_sound = assets.sound("assets/sounds/button_press.wav")
         self.click_sound.set_volume(0.4 * self.volume_ratio)
 
     def handle_events(self):
@@ -791,14 +1021,18 @@ class SettingsMenu(GameScene):
                         self.active_slider = index
                         break
                 if self.menu_button.collidepoint(event.pos):
-                    self.click_sound.play()
+                    voices.play(self.click_sound, "ui")
                     self.manager.load_scene(0)
                     self.close()
             if event.type == pygame.MOUSEBUTTONUP and self.is_drag:
                 self.is_drag = False
                 self.apply_settings(self.sliders[self.active_slider].value)
             if event.type == pygame.MOUSEMOTION and self.is_drag:
-                self.sliders[self.active_slider].process_drag(event.rel)
+                slider = self.sliders[self.active_slider]
+                # перерисовываются старое и новое положения ручки
+                self.mark_dirty(slider.get_area())
+                slider.process_drag(event.rel)
+                self.mark_dirty(slider.get_area())
 
     def redraw(self, win):
         win.blit(self.background, (0, 0))
@@ -848,8 +1082,43 @@ class Slider(StaticGameObject):
         win.blit(self.image, self.rect)
         win.blit(self.handle.image, self.handle.rect)
 
+    def get_area(self) -> pygame.Rect:
+        """метод для получения области слайдера вместе с ручкой"""
+        return self.rect.union(self.handle.rect)
+
     def set_value(self, new_value: float):
         if 0 <= new_value <= 2:
             self.value = new_value
             x_pos = int(self.rect.w / 2 * new_value + self.handle.rect.w / 2)
             self.handle.set_pos((x_pos, self.handle.y))
+
+
+class LoadingScreen(GameScene):
+    """Класс для экрана загрузки, показываемого, пока фоновая загрузка
+        ресурсов не завершена (job - объект PreloadJob)"""
+    BAR_RECT = (100, 320, 400, 24)
+
+    def __init__(self, display: pygame.Surface, manager, fps=60):
+        super().__init__(display, manager, fps)
+        self.job = None
+        self.font = pygame.font.SysFont("cambriacambriamath", 32)
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+        # декодированные файлы переводятся в формат экрана, пока
+        # остается время кадра
+        if self.job is None or self.job.process(0.8 / self.FPS):
+            self.close()
+
+    def redraw(self, win: pygame.Surface):
+        win.fill((255, 255, 255))
+        progress = 1 if self.job is None else self.job.progress
+        x, y, width, height = self.BAR_RECT
+        pygame.draw.rect(win, (200, 200, 200), self.BAR_RECT)
+        pygame.draw.rect(win, (0, 0, 0), (x, y, int(width * progress), height))
+        text = text_cache.render(
+            self.font, f"Loading {int(progress * 100)}%", True, "black")
+        win.blit(text, text.get_rect(center=(self.size[0] // 2, y - 30)))
@@ -0,0 +1,134 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+
+class SaveStore():
+    """Класс для хранения игровых сохранений в памяти
+        (файл читается один раз, изменения записываются пачками
+        в фоновом потоке через временный файл)"""
+
+    def __init__(self, path="values.json", delay=0.5):
+        self.path = path
+        # задержка перед фоновой записью для объединения изменений
+        self.delay = delay
+        self.data = None
+        self.loaded = False
+        self.dirty = False
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.thread = None
+        self.running = False
+
+    def load(self):
+        """метод для чтения файла сохранений (вызывается один раз)"""
+        with self.lock:
+            if self.loaded:
+                return
+            try:
+                with open(self.path, "r", encoding="u8") as f:
+                    self.data = json.load(f)
+            except Exception as err:
+                print(err)
+                self.data = None
+            self.loaded = True
+
+    def get(self, key, default=-1):
+        """метод для получения значения (default при ошибке загрузки)"""
+        if not self.loaded:
+            self.load()
+        if self.data is None:
+            return default
+        return self.data.get(key, default)
+
+    def get_data(self):
+        """метод для получения копии всех сохранений (None при ошибке)"""
+        if not self.loaded:
+            self.load()
+        with self.lock:
+            return dict(self.data) if self.data is not None else None
+
+    def set(self, key, value):
+        """метод для изменения значения и планирования записи в файл"""
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """метод для изменения нескольких значений за одну запись"""
+        if not self.loaded:
+            self.load()
+        with self.condition:
+            if self.data is None:
+                # не перезаписываем файл, который не удалось прочитать
+                print(f"{self.path} is not loaded, values are not saved")
+                return
+            self.data.update(values)
+            self.dirty = True
+            self.start()
+            self.condition.notify()
+
+    def start(self):
+        """метод для запуска фонового потока записи"""
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.write_behind,
+                                           name="save-store", daemon=True)
+            self.thread.start()
+
+    def write_behind(self):
+        """цикл фонового потока: ожидание изменений и запись с задержкой"""
+        with self.condition:
+            while self.running:
+                if not self.dirty:
+                    self.condition.wait()
+                    continue
+                self.condition.wait(self.delay)
+                self.condition.release()
+                try:
+                    self.flush()
+                finally:
+                    self.condition.acquire()
+
+    def flush(self):
+        """метод для немедленной атомарной записи изменений в файл"""
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                content = json.dumps(self.data)
+                self.dirty = False
+            directory = os.path.dirname(os.path.abspath(self.path))
+            temp_path = None
+            try:
+                descriptor, temp_path = tempfile.mkstemp(
+                    dir=directory, prefix=".values-", suffix=".tmp")
+                with os.fdopen(descriptor, "w", encoding="u8") as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except Exception as err:
+                print(err)
+                if temp_path is not None and os.path.exists(temp_path):
+                    os.remove(temp_path)
+                with self.lock:
+                    self.dirty = True
+            else:
+                self.writes += 1
+
+    def close(self):
+        """метод для остановки фонового потока с записью изменений"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+
+save_store = SaveStore()
+atexit.register(save_store.close)
@@ -0,0 +1,31 @@
+from audio import VoiceManager
+from headless import init_headless
+import pygame
+
+
+def create_manager():
+    init_headless()
+    manager = VoiceManager()
+    manager.set_num_channels(8)
+    # полсекунды тишины, чтобы звук не закончился во время теста
+    sound = pygame.mixer.Sound(buffer=bytes(44100 * 4 // 2))
+    return manager, sound
+
+
+def test_same_sound_in_one_frame_is_deduped():
+    manager, sound = create_manager()
+    manager.begin_frame()
+    manager.play(sound)
+    manager.play(sound)
+    assert manager.get_stats()["played"] == 1
+    assert manager.get_stats()["deduped"] == 1
+
+
+def test_same_sound_in_two_frames_is_not_deduped():
+    manager, sound = create_manager()
+    manager.begin_frame()
+    manager.play(sound)
+    manager.begin_frame()
+    manager.play(sound)
+    assert manager.get_stats()["played"] == 2
+    assert manager.get_stats()["deduped"] == 0
@@ -0,0 +1,95 @@
+from core import Group
+import pygame
+
+
+class Sprite(pygame.sprite.Sprite):
+    """спрайт, выполняющий действие с группой в update"""
+
+    def __init__(self, x, action=None):
+        super().__init__()
+        self.rect = pygame.Rect(x, 0, 10, 10)
+        self.to_delete = False
+        self.action = action
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+        self.rect.x += 200
+        if self.action is not None:
+            self.action(self)
+
+    def collides(self, rect):
+        return self.rect.colliderect(rect)
+
+
+def test_sprite_flagged_by_later_sprite_is_swept_in_same_update():
+    first = Sprite(0)
+    second = Sprite(50, lambda sprite: setattr(first, "to_delete", True))
+    group = Group(first, second, cell_size=64)
+    group.update()
+    assert first not in group
+    assert list(group) == [second]
+    assert group.get_rect_collisions(second.rect) == [second]
+
+
+def test_remove_and_add_inside_update():
+    group = Group(cell_size=64)
+    added = Sprite(400)
+    released = []
+    group.on_remove = released.append
+    removing = Sprite(0, lambda sprite: group.remove(sprite))
+
+    def add_once(sprite):
+        if sprite.updates == 1:
+            group.add(added)
+
+    adding = Sprite(100, add_once)
+    other = Sprite(200)
+    for sprite in (removing, adding, other):
+        group.add(sprite)
+    group.update()
+    assert list(group) == [adding, other, added]
+    assert released == [removing]
+    # удаленный спрайт не остается в ячейках индекса
+    assert removing not in group.get_rect_collisions(removing.rect)
+    group.update()
+    assert added.updates == 1
+    group.remove(added)
+    group.add(removing)
+    assert list(group) == [adding, other, removing]
+    assert group.get_rect_collisions(removing.rect) == [removing]
+
+
+def test_remove_pending_sprite_inside_update():
+    group = Group()
+    pending = Sprite(0)
+
+    def add_and_remove(sprite):
+        group.add(pending)
+        group.remove(pending)
+
+    group.add(Sprite(100, add_and_remove))
+    group.update()
+    assert pending not in group
+    assert len(group) == 1
+
+
+def test_clear_inside_update():
+    group = Group(cell_size=64)
+    first = Sprite(0, lambda sprite: group.clear())
+    second = Sprite(100)
+    group.add(first)
+    group.add(second)
+    group.update()
+    assert len(group) == 0
+    assert group.index.bounds == {}
+
+
+def test_group_changes_while_iterating():
+    sprites = [Sprite(x * 20) for x in range(5)]
+    group = Group(*sprites, cell_size=64)
+    for sprite in group:
+        group.remove(sprite)
+        group.add(Sprite(0))
+    assert len(group) == 5
+    assert not any(sprite in group for sprite in sprites)
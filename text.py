@@ -0,0 +1,87 @@
+from collections import OrderedDict
+import pygame
+
+
+class TextCache():
+    """Класс для хранения отрисованных строк с вытеснением давно
+        не использованных (LRU)"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_color_key(color):
+        """метод для перевода цвета в хэшируемый ключ"""
+        if isinstance(color, (str, tuple)):
+            return color
+        return tuple(pygame.Color(color))
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool,
+               color) -> pygame.Surface:
+        """метод для получения отрисованной строки (аргументы как у
+            Font.render)"""
+        key = (font, text, self.get_color_key(color), antialias)
+        if (surface := self.surfaces.get(key)) is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+class DigitRenderer():
+    """Класс для отрисовки чисел из заранее отрисованных символов
+        (строка собирается из блитов глифов без рендера шрифта)"""
+
+    def __init__(self, font: pygame.font.Font, color, antialias=True,
+                 chars="0123456789-$"):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.glyphs = {char: font.render(char, antialias, color)
+                       for char in chars}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def can_render(self, text: str) -> bool:
+        return all(char in self.glyphs for char in text)
+
+    def get_width(self, text: str) -> int:
+        """метод для получения ширины строки"""
+        if not self.can_render(text):
+            return self.font.size(text)[0]
+        return sum(self.glyphs[char].get_width() for char in text)
+
+    def draw(self, win: pygame.Surface, text: str, pos: tuple):
+        """метод для отрисовки строки (неизвестные символы отрисовываются
+            шрифтом через общий кэш строк)"""
+        if not self.can_render(text):
+            win.blit(text_cache.render(self.font, text, self.antialias,
+                                       self.color), pos)
+            return
+        x, y = pos
+        for char in text:
+            glyph = self.glyphs[char]
+            win.blit(glyph, (x, y))
+            x += glyph.get_width()